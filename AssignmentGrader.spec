@@ -5,8 +5,8 @@ a = Analysis(
     ['grader_gui.py'],
     pathex=[],
     binaries=[('chromedriver.exe', '.')],
-    datas=[('my_first_website_grader.py', '.'), ('utilities.py', '.'), ('auto_canvas.py', '.'), ('dungeon_grader.py', '.'), ('test_part_2_grader.py', '.'), ('my_first_webpage_grader.py', '.'), ('my_second_webpage_grader.py', '.')],
-    hiddenimports=['bs4', 'selenium', 'pandas', 'pygetwindow'],
+    datas=[('my_first_website_grader.py', '.'), ('utilities.py', '.'), ('auto_canvas.py', '.'), ('dungeon_grader.py', '.'), ('test_part_2_grader.py', '.'), ('my_first_webpage_grader.py', '.'), ('my_second_webpage_grader.py', '.'), ('http_client.py', '.'), ('http_cache.py', '.'), ('parsed_page.py', '.'), ('html_parsers.py', '.'), ('grading_manifest.py', '.'), ('grading_pool.py', '.'), ('site_crawler.py', '.'), ('link_checker.py', '.'), ('rubric.py', '.'), ('tracing.py', '.'), ('canvas_api.py', '.'), ('results_writer.py', '.'), ('graders.py', '.'), ('results_model.py', '.')],
+    hiddenimports=['bs4', 'lxml', 'selenium', 'pygetwindow', 'auto_canvas', 'my_first_webpage_grader', 'my_second_webpage_grader', 'my_first_website_grader', 'dungeon_grader', 'test_part_2_grader'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
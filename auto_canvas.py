@@ -2,7 +2,6 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import pygetwindow as gw
@@ -10,8 +9,160 @@ import getpass
 import time
 import os
 import sys
+import json
+import threading
+import tracing
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from canvas_api import student_key, GradeResult
 
-def putGradesIn(students, speedGrader=None, username=None, password=None, updateAll=False):
+# Saved Canvas cookies, so a new browser can skip the login form
+COOKIE_FILE = os.path.join(os.path.expanduser("~"), ".assignment_grader", "canvas_cookies.json")
+COOKIE_MAX_AGE = 12 * 60 * 60  # Seconds before saved cookies are no longer tried
+IDLE_TIMEOUT = 15 * 60  # Seconds an unused browser is kept open
+
+class CanvasSession:
+    """
+    A logged-in Canvas browser that can be reused across putGradesIn calls.
+
+    The browser stays open between calls and is closed after `idle_timeout`
+    seconds without use. After a login its cookies are saved to `cookie_path`,
+    and a new browser (a later call, another run, or a parallel session) loads
+    them first, so the login form is only filled in when the Canvas session
+    has actually expired. Credentials are asked for at that point if they
+    weren't given.
+    """
+    def __init__(self, username=None, password=None, headless=False, cookie_path=COOKIE_FILE, idle_timeout=IDLE_TIMEOUT):
+        self.username = username
+        self.password = password
+        self.headless = headless
+        self.cookie_path = cookie_path
+        self.idle_timeout = idle_timeout
+        self.driver = None
+        self.logins = 0
+        self._lock = threading.RLock()
+        self._idle_timer = None
+
+    def open(self, speedGrader, session_number=1):
+        """Return a driver showing SpeedGrader, logging in only if needed."""
+        with self._lock:
+            self._cancel_idle_timer()
+            if self.driver is not None and not self._alive():
+                self.driver = None
+            if self.driver is None:
+                self.driver = new_driver(self.headless)
+                self._restore_cookies(speedGrader)
+
+            driver = self.driver
+            wait = WebDriverWait(driver, 10)
+            driver.get(speedGrader)
+            # Either SpeedGrader loads, or Canvas wants us to log in first
+            wait.until(lambda d: d.find_elements(By.ID, "students_selectmenu") or d.find_elements(By.ID, "pseudonym_session_unique_id"))
+            if not driver.find_elements(By.ID, "students_selectmenu"):
+                self._login(driver, wait, session_number)
+                self._save_cookies(speedGrader)
+            return driver
+
+    def release(self):
+        """Done for now; close the browser if it isn't used again soon."""
+        with self._lock:
+            self._cancel_idle_timer()
+            if self.driver is not None and self.idle_timeout:
+                self._idle_timer = threading.Timer(self.idle_timeout, self.close)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def close(self):
+        with self._lock:
+            self._cancel_idle_timer()
+            if self.driver is not None:
+                try:
+                    self.driver.quit()
+                except Exception as e:
+                    print(f"Error closing browser: {e}")
+                self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _alive(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _login(self, driver, wait, session_number):
+        # Locate login elements
+        username_input = wait.until(EC.presence_of_element_located((By.ID, "pseudonym_session_unique_id")))
+        password_input = wait.until(EC.presence_of_element_located((By.ID, "pseudonym_session_password")))
+        login_button = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "Button--login")))
+
+        # Get credentials securely, using provided values if available
+        if not self.username:
+            self.username = input("Canvas Username: ")
+        if not self.password:
+            self.password = getpass.getpass("Canvas Password: ")
+
+        # Perform login
+        with tracing.span('canvas.login', session=session_number):
+            username_input.send_keys(self.username)
+            password_input.send_keys(self.password)
+            login_button.click()
+
+            # SpeedGrader has loaded once its student list is on the page
+            wait.until(EC.presence_of_element_located((By.ID, "students_selectmenu")))
+        self.logins += 1
+
+    def _load_cookie_file(self):
+        try:
+            with open(self.cookie_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _restore_cookies(self, speedGrader):
+        if not self.cookie_path:
+            return
+        parsed = urlparse(speedGrader)
+        saved = self._load_cookie_file().get(parsed.netloc)
+        if not saved or time.time() - saved['saved_at'] > COOKIE_MAX_AGE:
+            return
+        # Cookies can only be set for the site the browser is on
+        self.driver.get(f"{parsed.scheme}://{parsed.netloc}/")
+        now = time.time()
+        for cookie in saved['cookies']:
+            if cookie.get('expiry') and cookie['expiry'] < now:
+                continue
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception:
+                continue
+
+    def _save_cookies(self, speedGrader):
+        if not self.cookie_path:
+            return
+        stored = self._load_cookie_file()
+        stored[urlparse(speedGrader).netloc] = {'saved_at': time.time(), 'cookies': self.driver.get_cookies()}
+        try:
+            os.makedirs(os.path.dirname(self.cookie_path), exist_ok=True)
+            temp_path = self.cookie_path + '.tmp'
+            # The cookies log in as the teacher, so only the owner may read them
+            with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as file:
+                json.dump(stored, file)
+            os.replace(temp_path, self.cookie_path)
+        except OSError as e:
+            print(f"Error saving Canvas cookies: {e}")
+
+def putGradesIn(students, speedGrader=None, username=None, password=None, updateAll=False, sessions=1, headless=False, session=None):
     """
     Function to automate grading in Canvas SpeedGrader.
 
@@ -19,80 +170,120 @@ def putGradesIn(students, speedGrader=None, username=None, password=None, update
     - students: A list of tuples containing (student_name, grade, feedback), 
                 where student_name is in the format 'middlename1middlename2lastnamefirstname'.
     - speedGrader: URL of the SpeedGrader page (optional, if not provided, will prompt).
-    - username: Canvas username (optional, if not provided, will prompt).
-    - password: Canvas password (optional, if not provided, will prompt).
+    - username: Canvas username (optional, if not provided, will prompt when a login is needed).
+    - password: Canvas password (optional, if not provided, will prompt when a login is needed).
+    - sessions: Number of browser sessions to split the students across. Each
+                logs in once and handles its own share of the students.
+    - headless: Run the browsers without windows (always on for several sessions).
+    - session: A CanvasSession to reuse. Its browser is left open for the next
+               call; otherwise a session is made for this call and closed after.
+
+    Returns a list of canvas_api.GradeResult, one per student.
     """
     print()
-    # Set logging preferences in DesiredCapabilities
-    caps = DesiredCapabilities.CHROME.copy()
-    caps['goog:loggingPrefs'] = {'browser': 'OFF', 'driver': 'OFF'}
+    if not speedGrader:
+        speedGrader = input("What is the URL of the SpeedGrader you want to interact with?\n")
+    if updateAll:
+        updateAll = input("Update All? (y/n): ").strip().lower() == "y"
 
+    # All of a student's tuples (on time and late) go to the same session, so
+    # two browsers never enter grades for the same student
+    by_student = {}
+    for student in students:
+        by_student.setdefault(student[0], []).append(student)
+    groups = list(by_student.values())
+
+    sessions = max(1, min(int(sessions or 1), len(groups) or 1))
+    own_session = session is None
+    if own_session:
+        session = CanvasSession(username, password, headless=headless or sessions > 1)
+    else:
+        session.username = username or session.username
+        session.password = password or session.password
+    extra_sessions = []
+    try:
+        if sessions == 1:
+            shards = [students]
+        else:
+            # Deal the students out so every session gets a similar share
+            shards = [[student for group in groups[index::sessions] for student in group] for index in range(sessions)]
+            print(f"Splitting {len(groups)} students across {sessions} headless sessions.")
+
+        # Log in once up front (asking for credentials if needed); the other
+        # sessions start from the saved cookies
+        session.open(speedGrader)
+        extra_sessions = [CanvasSession(session.username, session.password, headless=True, cookie_path=session.cookie_path, idle_timeout=0)
+                          for _ in shards[1:]]
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            futures = [executor.submit(grade_in_session, shard, speedGrader, updateAll, shard_session, index + 1)
+                       for index, (shard, shard_session) in enumerate(zip(shards, [session] + extra_sessions))]
+            for future in futures:
+                try:
+                    for result in future.result():
+                        results[result.student] = result
+                except Exception as e:
+                    print(f"Error: {e}")
+
+        # One merged report, in the order the students were given. Students a
+        # session never got to (e.g. it failed to log in) are reported as failed.
+        return [results.get(student[0]) or GradeResult(student[0], None, None, 'failed', "Not reached; the browser session ended early.")
+                for student in students]
+    finally:
+        for extra_session in extra_sessions:
+            extra_session.close()
+        if own_session:
+            session.close()
+        else:
+            session.release()
+        # Add the Canvas stages to the run's timing trace
+        tracing.report()
+
+def new_driver(headless=False):
     # Configure ChromeOptions
     options = webdriver.ChromeOptions()
     options.set_capability('goog:loggingPrefs', {'browser': 'OFF', 'driver': 'OFF'})
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1400,1000")
 
     # Initialize WebDriver
-    driver = webdriver.Chrome(options=options)
-    
-    if not speedGrader:
-        speedGrader = input("What is the URL of the SpeedGrader you want to interact with?\n")
-    driver.get(speedGrader)
+    return webdriver.Chrome(options=options)
 
+def grade_in_session(students, speedGrader, updateAll, session, session_number=1):
+    """Enter grades for the given students with one logged-in browser."""
+    results = []
     try:
-        # Wait for the login elements to appear
+        driver = session.open(speedGrader, session_number)
         wait = WebDriverWait(driver, 10)
 
-        # Locate login elements
-        username_input = wait.until(EC.presence_of_element_located((By.ID, "pseudonym_session_unique_id")))
-        password_input = wait.until(EC.presence_of_element_located((By.ID, "pseudonym_session_password")))
-        login_button = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "Button--login")))
-
-        # Get credentials securely, using provided values if available
-        if not username:
-            username = input("Canvas Username: ")
-        if not password:
-            password = getpass.getpass("Canvas Password: ")
-        if updateAll:
-            updateAll = input("Update All? (y/n): ").strip().lower() == "y"
-
-        # Perform login
-        username_input.send_keys(username)
-        password_input.send_keys(password)
-        login_button.click()
-
-        # Allow time for the page to load
-        time.sleep(4)
+        # Work out which students need visiting before touching any of them
+        roster = read_roster(driver)
+        # A student with several tuples (on time and late) keeps the first, as before
+        pending = {}
+        for student in students:
+            pending.setdefault(student[0], student)
+        for parsed_name_canvas in list(pending):
+            if parsed_name_canvas not in roster:
+                print(f"Student {parsed_name_canvas} is not in SpeedGrader. Skipping...")
+                results.append(GradeResult(parsed_name_canvas, None, None, 'not_found', "No student with this name in SpeedGrader."))
+                del pending[parsed_name_canvas]
+            elif not roster[parsed_name_canvas][2] and not updateAll:
+                user_id, student_name_canvas, _ = roster[parsed_name_canvas]
+                results.append(GradeResult(parsed_name_canvas, student_name_canvas, user_id, 'skipped', "Already graded."))
+                del pending[parsed_name_canvas]
+        print(f"{len(pending)} Students to update")
 
-        while students:
-            attempts = 0
-            found = False
-            student_name_canvas = ""
-            parsed_name_canvas = ""
-            needs_grading = True
-
-            while attempts < 3 and needs_grading:
+        for parsed_name_canvas, (raw_name, grade, feedback) in pending.items():
+            user_id, student_name_canvas, _ = roster[parsed_name_canvas]
+            result = None
+            for attempt in range(3):
                 try:
-                    student_name_canvas = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "ui-selectmenu-item-header"))).text.strip()
-                    needs_grading = len(driver.find_elements(By.CLASS_NAME, "ui-selectmenu-item-icon.speedgrader-selectmenu-icon")) >= 1
-                    if not needs_grading and not updateAll:
-                        break
-
-                    name_parts = student_name_canvas.split(" ")
-                    print(f"Raw name: {student_name_canvas}, Split parts: {name_parts}")
-
-                    if len(name_parts) >= 2:
-                        canvas_firstname = name_parts[0]
-                        canvas_lastname = name_parts[-1].replace("-", "")
-                        canvas_middlenames = "".join(name_parts[1:-1])
-                        parsed_name_canvas = f"{canvas_middlenames.lower()}{canvas_lastname.lower()}{canvas_firstname.lower()}"
-                    else:
-                        raise ValueError(f"Invalid name format: {student_name_canvas}")
-
-                    print(f"Looking for {parsed_name_canvas} in the list.")
-                    matching_student = next((student for student in students if student[0] == parsed_name_canvas), None)
-
-                    if matching_student:
-                        raw_name, grade, feedback = matching_student
+                    with tracing.span('canvas.student', student=parsed_name_canvas) as span:
+                        # Jump straight to the student instead of clicking through the roster
+                        driver.get(student_url(speedGrader, user_id))
+                        wait.until(lambda d: student_name_canvas in d.find_element(By.CLASS_NAME, "ui-selectmenu-item-header").text)
                         print(f"Setting grade for {student_name_canvas}")
 
                         grade_input = wait.until(EC.presence_of_element_located((By.ID, "grading-box-extended")))
@@ -112,37 +303,49 @@ def putGradesIn(students, speedGrader=None, username=None, password=None, update
                             print(f"Feedback entered: {feedback}")
 
                             driver.switch_to.default_content()
-                            feedback_submit = driver.find_element(By.ID, "comment_submit_button")
-                            time.sleep(1)
-                            feedback_submit.click()
-                            time.sleep(3)
+                            comment_count = len(driver.find_elements(By.CSS_SELECTOR, "#comments .comment"))
+                            wait.until(EC.element_to_be_clickable((By.ID, "comment_submit_button"))).click()
+                            # Done once the new comment is added to the student's comment list
+                            wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "#comments .comment")) > comment_count)
+                            span.set(updated=True)
+                            result = GradeResult(parsed_name_canvas, student_name_canvas, user_id, 'updated', f"Grade set to {grade}.")
                         else:
                             print(f"Grade already set to {current_grade}, no update needed.")
-
-                        students.remove(matching_student)
-                        print(f"Successfully submitted for {parsed_name_canvas}. Removed from the list.")
-                        found = True
-                        break
-
+                            span.set(updated=False)
+                            result = GradeResult(parsed_name_canvas, student_name_canvas, user_id, 'unchanged', f"Grade already set to {current_grade}.")
+                    print(f"Successfully submitted for {parsed_name_canvas}.")
+                    break
                 except Exception as e:
-                    print(f"Error during attempt {attempts + 1}: {e}")
-                attempts += 1
-
-            if not found:
-                print(f"Student {student_name_canvas} not found after 3 attempts. Removing from the list and skipping...")
-                if student_name_canvas:
-                    students = [student for student in students if student[0] != parsed_name_canvas]
-            print(f"{len(students)} Students Remaining")
-
-            try:
-                next_button = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "icon-arrow-right")))
-                next_button.click()
-                time.sleep(3)
-            except Exception:
-                print("No next button found. Ending grading process.")
-                break
+                    driver.switch_to.default_content()
+                    print(f"Error during attempt {attempt + 1}: {e}")
+                    result = GradeResult(parsed_name_canvas, student_name_canvas, user_id, 'failed', str(e))
+            results.append(result)
 
     except Exception as e:
         print("Error:", e)
-    finally:
-        driver.quit()
\ No newline at end of file
+    return results
+
+def read_roster(driver):
+    """
+    Map student keys to (user id, name as shown, needs grading) using the
+    options of SpeedGrader's student menu.
+    """
+    roster = {}
+    for option in driver.find_elements(By.CSS_SELECTOR, "#students_selectmenu option"):
+        student_name_canvas = option.get_attribute("textContent").strip()
+        user_id = option.get_attribute("value")
+        try:
+            parsed_name_canvas = student_key(student_name_canvas)
+        except ValueError as e:
+            print(e)
+            continue
+        classes = (option.get_attribute("class") or "").split()
+        roster[parsed_name_canvas] = (user_id, student_name_canvas, 'not_graded' in classes or 'resubmitted' in classes)
+    return roster
+
+def student_url(speed_grader_url, user_id):
+    """The SpeedGrader URL opened on one student."""
+    parsed = urlparse(speed_grader_url)
+    query = [(key, value) for key, value in parse_qsl(parsed.query) if key != 'student_id']
+    query.append(('student_id', str(user_id)))
+    return urlunparse(parsed._replace(query=urlencode(query), fragment=''))
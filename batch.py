@@ -0,0 +1,239 @@
+# Batch grading
+#
+# Grades several submission zips (sections, assignments) in one go without
+# any prompts. Jobs run a few at a time in one process, so they share the HTTP
+# connection pool, the HTTP cache and the link-check cache. Each job writes its
+# usual results folder; a summary of all jobs is written at the end. Grades are
+# only sent to Canvas when --submit is given.
+#
+#   python batch.py --job period1.zip dungeon results/p1 --job period2.zip dungeon results/p2
+#   python batch.py --jobs week5.json --submit api
+#
+# A job file is a JSON list of jobs:
+#
+#   [{"zip": "period1.zip", "grader": "dungeon", "results": "results/p1",
+#     "speed_grader_url": "https://canvas.example.edu/courses/1/gradebook/speed_grader?assignment_id=2"}]
+#
+# speed_grader_url is only needed with --submit. "grader" can also be a list
+# (or names joined with "+" in --job): each page is then fetched once and graded
+# under every rubric, into one CSV, and speed_grader_url can be a
+# {rubric name: URL} dict.
+#
+# With GRADER_TRACE=1 one timing trace covering every job (each under a 'job'
+# span) is written next to the summary, rather than one per results folder.
+import argparse
+import csv
+import getpass
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import canvas_api
+import graders
+import http_cache
+import http_client
+import link_checker
+import tracing
+import utilities
+
+DEFAULT_CONCURRENCY = 2  # Jobs graded at the same time
+CACHE_DIR = ".grader_cache"
+SUMMARY_FILE = "batch_summary.csv"
+SUMMARY_COLUMNS = ['zip', 'grader', 'results', 'status', 'students', 'mean_score', 'min_score', 'max_score',
+                   'errors', 'seconds', 'csv', 'canvas']
+
+# Graders that grade the HTML files in the zip themselves rather than the
+# sites they link to; they take (zip path, results path) and return the CSV path
+ZIP_GRADERS = {
+    "heading hr": "heading_hr_grader:grade_zip",
+}
+
+def load_jobs(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        jobs = json.load(file)
+    if isinstance(jobs, dict):
+        jobs = jobs.get('jobs', [])
+    for job in jobs:
+        missing = [key for key in ('zip', 'grader', 'results') if not job.get(key)]
+        if missing:
+            raise ValueError(f"Job {job} is missing {', '.join(missing)}")
+    return jobs
+
+def job_graders(job):
+    grader = job['grader']
+    return list(grader) if isinstance(grader, list) else grader.split('+')
+
+def load_zip_grader(name):
+    module_name, _, function_name = ZIP_GRADERS[name].partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+def run_job(job, workers, processes, incremental):
+    """
+    Grade one zip. Returns [(summary dict, grading tuples for Canvas)], one
+    per rubric.
+    """
+    started = time.monotonic()
+    names = job_graders(job)
+    summaries = [{'zip': job['zip'], 'grader': name, 'results': job['results']} for name in names]
+    grading_tuples = {}
+    try:
+        with tracing.span('job', zip=job['zip'], grader="+".join(names)):
+            if names[0] in ZIP_GRADERS:
+                csv_path = load_zip_grader(names[0])(job['zip'], job['results'])
+            else:
+                # The batch sets up one shared cache, so the per-job one is skipped.
+                # Jobs also share the tracer, so main() writes one trace for all of them.
+                submissions = utilities.grading_setup(job['zip'], job['results'], use_cache=False)
+                if len(names) == 1:
+                    grading_tuples[names[0]] = utilities.grade_extracted_files(graders.load(names[0]), job['results'], submissions, names[0],
+                                                                               max_workers=workers, incremental=incremental, processes=processes, trace=False)
+                else:
+                    grading_tuples = utilities.grade_extracted_files({name: graders.load(name) for name in names}, job['results'], submissions, "+".join(names),
+                                                                     max_workers=workers, incremental=incremental, processes=processes, trace=False)
+                csv_path = os.path.join(job['results'], "csv", "grading_results.csv")
+        for summary in summaries:
+            prefix = f"{summary['grader']} " if len(names) > 1 else ""
+            summary.update(summarize_csv(csv_path, prefix), status='ok', csv=csv_path)
+    except Exception as e:
+        for summary in summaries:
+            summary.update(status=f"failed: {e}")
+    for summary in summaries:
+        summary['seconds'] = round(time.monotonic() - started, 1)
+    return [(summary, grading_tuples.get(summary['grader'])) for summary in summaries]
+
+def summarize_csv(csv_path, prefix=""):
+    scores = []
+    errors = 0
+    with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            if row.get(prefix + 'Feedback', '').startswith("Error processing"):
+                errors += 1
+            try:
+                scores.append(float(row[prefix + 'Score']))
+            except (KeyError, ValueError):
+                continue
+    return {
+        'students': len(scores),
+        'mean_score': round(sum(scores) / len(scores), 2) if scores else '',
+        'min_score': min(scores) if scores else '',
+        'max_score': max(scores) if scores else '',
+        'errors': errors,
+    }
+
+def submit(job, grader, grading_tuples, method, token, update_all, session):
+    if grading_tuples is None:
+        return "not submitted (this grader's results are per file, not per student)"
+    speed_grader_url = job.get('speed_grader_url')
+    if isinstance(speed_grader_url, dict):
+        speed_grader_url = speed_grader_url.get(grader)
+    if not speed_grader_url:
+        return "not submitted (no speed_grader_url)"
+    if method == 'api':
+        results = canvas_api.submit_grades(grading_tuples, speed_grader_url, token, update_all=update_all)
+    else:
+        from auto_canvas import putGradesIn
+        results = putGradesIn(grading_tuples, speed_grader_url, session=session)
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    canvas_api.print_report(results)
+    return ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+
+def write_summary(path, summaries):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summaries)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade several submission zips without prompts.")
+    parser.add_argument('--jobs', help="JSON file listing the jobs")
+    parser.add_argument('--job', nargs=3, action='append', default=[], metavar=('ZIP', 'GRADER', 'RESULTS'),
+                        help="one job; can be given more than once")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="jobs graded at the same time")
+    parser.add_argument('--workers', type=int, default=utilities.DEFAULT_WORKERS, help="students fetched at the same time per job")
+    parser.add_argument('--processes', type=int, default=utilities.DEFAULT_PROCESSES, help="grading worker processes per job")
+    parser.add_argument('--full', action='store_true', help="regrade everyone instead of reusing unchanged results")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="HTTP and link-check cache shared by all jobs")
+    parser.add_argument('--no-cache', action='store_true', help="don't keep fetched pages between runs")
+    parser.add_argument('--summary', default=SUMMARY_FILE, help="where to write the summary CSV")
+    parser.add_argument('--submit', choices=['api', 'speedgrader'], help="send the grades to Canvas after grading")
+    parser.add_argument('--update-all', action='store_true', help="with --submit api, also replace grades already entered")
+    parser.add_argument('--list-graders', action='store_true', help="show the grader names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list_graders:
+        print("\n".join(graders.names() + list(ZIP_GRADERS)))
+        return []
+    jobs = load_jobs(args.jobs) if args.jobs else []
+    jobs += [{'zip': zip_path, 'grader': grader, 'results': results} for zip_path, grader, results in args.job]
+    if not jobs:
+        parser.error("give --jobs or at least one --job")
+    known = set(graders.names()) | set(ZIP_GRADERS)
+    unknown = sorted({name for job in jobs for name in job_graders(job)} - known)
+    if unknown:
+        parser.error(f"unknown grader(s): {', '.join(unknown)}; choose from: {', '.join(sorted(known))}")
+    if any(len(job_graders(job)) > 1 and set(job_graders(job)) & set(ZIP_GRADERS) for job in jobs):
+        parser.error(f"{', '.join(ZIP_GRADERS)} can't be combined with other graders in one job")
+    results_dirs = [os.path.abspath(job['results']) for job in jobs]
+    if len(set(results_dirs)) != len(results_dirs):
+        parser.error("each job needs its own results folder")
+    if args.update_all and args.submit != 'api':
+        parser.error("--update-all only works with --submit api")
+
+    token = None
+    if args.submit == 'api':
+        # Ask before grading starts rather than after
+        token = os.environ.get(canvas_api.TOKEN_ENV_VAR) or getpass.getpass("Canvas API token: ")
+
+    # One connection pool and one set of caches for every job
+    concurrency = max(1, args.concurrency)
+    http_client.configure(pool_size=max(http_client.DEFAULT_POOL_SIZE, args.workers * concurrency))
+    if not args.no_cache:
+        http_client.enable_cache(os.path.join(args.cache_dir, "http_cache"), ttl=http_cache.DEFAULT_TTL)
+        link_checker.configure(os.path.join(args.cache_dir, link_checker.LINK_CACHE_FILE))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(lambda job: run_job(job, args.workers, args.processes, not args.full), jobs))
+    link_checker.save()
+
+    summaries = [summary for job_outcomes in outcomes for summary, _ in job_outcomes]
+    if args.submit:
+        session = None
+        if args.submit == 'speedgrader':
+            from auto_canvas import CanvasSession
+            session = CanvasSession()
+        try:
+            for job, job_outcomes in zip(jobs, outcomes):
+                for summary, grading_tuples in job_outcomes:
+                    if summary['status'] != 'ok':
+                        continue
+                    try:
+                        summary['canvas'] = submit(job, summary['grader'], grading_tuples, args.submit, token, args.update_all, session)
+                    except Exception as e:
+                        summary['canvas'] = f"failed: {e}"
+        finally:
+            if session is not None:
+                session.close()
+
+    write_summary(args.summary, summaries)
+    tracing.report(os.path.join(os.path.dirname(args.summary), tracing.TRACE_FILE))
+    for summary in summaries:
+        print(f"{summary['zip']} ({summary['grader']}): {summary['status']}, {summary.get('students', 0)} students, "
+              f"mean {summary.get('mean_score', '')}, {summary['seconds']} s" + (f", Canvas: {summary['canvas']}" if summary.get('canvas') else ""))
+    print(f"Summary saved to: {args.summary}")
+    if any(summary['status'] != 'ok' for summary in summaries):
+        sys.exit(1)
+    return summaries
+
+if __name__ == "__main__":
+    # Required for the grading worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,8 @@
+# End-to-end throughput benchmarks
+#
+# Everything runs offline: corpus.py builds a synthetic Canvas submissions zip
+# and the student sites it points at, server.py serves those sites locally with
+# artificial latency, and run.py grades the zip with each grader and reports
+# students/sec, per-student latency and peak memory.
+#
+#   python -m benchmarks.run --students 100 --latency 0.05
@@ -0,0 +1,166 @@
+# Synthetic class corpus
+#
+# Builds the student sites the benchmark server serves and a Canvas-style
+# submissions zip pointing at them. Sites are generated from a seed so every
+# run grades exactly the same work. Each rubric feature is left out of a page
+# with probability `defect_rate`, so the graders take their failure paths too.
+import random
+import zipfile
+
+FIRST_NAMES = ['ada', 'alan', 'grace', 'linus', 'barbara', 'ken', 'margaret', 'dennis', 'frances', 'edsger']
+LAST_NAMES = ['lovelace', 'turing', 'hopper', 'torvalds', 'liskov', 'thompson', 'hamilton', 'ritchie', 'allen', 'dijkstra']
+
+WORDS = "the cereal map dungeon legend crunchy sweet table page heading list image link style border color".split()
+
+# Share of submissions of each special kind in the zip
+LATE_RATIO = 0.1
+ANCHOR_RATIO = 0.3  # Anchor tag instead of a meta refresh
+NO_URL_RATIO = 0.03
+LOCAL_URL_RATIO = 0.03
+JUNK_RATIO = 0.05  # Images and PDFs submitted instead of a URL file
+
+def student_names(count):
+    """Unique Canvas-style names (lastfirst), in a stable order."""
+    names = []
+    for index in range(count):
+        first = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        suffix = index // (len(FIRST_NAMES) * len(LAST_NAMES))
+        names.append(f"{last}{first}{suffix or ''}")
+    return names
+
+def _sentence(rng, words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def make_page(rng, title, links, external_url, paragraphs=3, images=3, defect_rate=0.1):
+    """
+    One student page with the elements the rubrics look for.
+
+    `links` is a list of (href, new_tab) internal links to put on the page.
+    """
+    def include():
+        return rng.random() >= defect_rate
+
+    parts = []
+    if include():
+        parts.append("<!DOCTYPE html>")
+    parts.append("<html>\n<head>\n  <title>%s</title>\n  <style>.fancy {color: navy; border: 1px solid}</style>\n</head>" % title)
+    parts.append('<body style="background-color: #fafafa">')
+    if include():
+        parts.append('  <h1 style="color: navy">%s</h1>' % title)
+    parts.append("  <hr>")
+    for index in range(paragraphs):
+        if index and include():
+            parts.append('  <h2 style="color: teal">Section %d</h2>' % index)
+        parts.append("  <p>%s %s &amp; more</p>" % (_sentence(rng), _sentence(rng)))
+
+    for tag in ('ul', 'ol'):
+        if include():
+            items = "".join("<li>%s</li>" % _sentence(rng, 3) for _ in range(rng.randint(2, 5)))
+            parts.append('  <%s style="border: 1px dashed">%s</%s>' % (tag, items, tag))
+
+    for index in range(images):
+        parts.append('  <h3>Picture %d</h3>' % index)
+        alt = ' alt="picture %d"' % index if include() else ""
+        parts.append('  <img src="picture%d.png"%s>' % (index, alt))
+    if include():
+        parts.append('  <img src="border.png" alt="border" style="border: 4px solid">')
+    if include():
+        parts.append('  <img src="youtube.png" alt="YouTube" width="80px">')
+
+    # Dungeon map: a 5x5 grid with an image and an external link
+    if include():
+        rows = []
+        for row in range(5):
+            cells = []
+            for column in range(5):
+                if row == 0 and column == 0:
+                    cells.append('<td style="background-color: gray"><img src="door.png" alt="door"></td>')
+                elif row == 4 and column == 4 and include():
+                    cells.append('<td><a href="%s">exit</a></td>' % external_url)
+                else:
+                    cells.append('<td class="fancy">%s</td>' % rng.choice(WORDS))
+            rows.append("<tr>%s</tr>" % "".join(cells))
+        parts.append('  <table style="border: 1px solid">%s</table>' % "".join(rows))
+
+    # Legend with a header row
+    if include():
+        parts.append("  <h2>Legend</h2>")
+        rows = ["<tr><th>Symbol</th><th>Meaning</th></tr>"]
+        rows += ["<tr><td>%s</td><td>%s</td></tr>" % (rng.choice(WORDS), _sentence(rng, 3)) for _ in range(5)]
+        parts.append('  <table class="fancy">%s</table>' % "".join(rows))
+
+    for href, new_tab in links:
+        target = ' target="_blank"' if new_tab else ""
+        parts.append('  <a href="%s"%s>%s</a>' % (href, target, rng.choice(WORDS)))
+    if include():
+        parts.append('  <a href="%s" target="_blank">More</a>' % external_url)
+        parts.append('  <a href="%s" target="_blank">Even more</a>' % external_url)
+    parts.append("</body>\n</html>\n")
+    return "\n".join(parts)
+
+def make_site(rng, pages=3, paragraphs=3, images=3, external_url="http://example.com/", defect_rate=0.1):
+    """
+    Pages of one student's site as {relative path: html}.
+
+    index.html links to every other page, and each page links back to it
+    (sometimes in a new tab, which the website grader penalises).
+    """
+    names = ["index.html"] + ["page%d.html" % index for index in range(1, pages)]
+    site = {}
+    for name in names:
+        if name == "index.html":
+            links = [(other, False) for other in names[1:]]
+        else:
+            links = [("index.html", rng.random() < defect_rate)]
+        site[name] = make_page(rng, name.split('.')[0].title(), links, external_url, paragraphs, images, defect_rate)
+    return site
+
+def make_sites(students, seed=0, **options):
+    """Every student's site as {URL path: html}, e.g. '/s/turingada/index.html'."""
+    rng = random.Random(seed)
+    files = {}
+    for student in students:
+        for name, html in make_site(rng, **options).items():
+            files[f"/s/{student}/{name}"] = html
+    return files
+
+def _url_file(rng, url):
+    if rng.random() < ANCHOR_RATIO:
+        return '<html><body><a href="%s">%s</a></body></html>' % (url, url)
+    return '<html><head><meta http-equiv="Refresh" content="0; url=%s"></head></html>' % url
+
+def make_submissions_zip(path, students, base_url, seed=0):
+    """
+    Write a Canvas-style submissions zip for the students' sites.
+
+    Most files are meta refresh or anchor redirects to the student's site.
+    Some are late, some point at a local address or have no URL, and some are
+    junk uploads (images, PDFs, a nested folder) that graders must skip.
+    Returns the number of submissions that point at a gradable site.
+    """
+    rng = random.Random(seed)
+    gradable = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for number, student in enumerate(students, start=1):
+            late = "_LATE" if rng.random() < LATE_RATIO else ""
+            prefix = f"{student}{late}_{1000 + number}_{5000 + number}"
+            roll = rng.random()
+            if roll < JUNK_RATIO:
+                archive.writestr(f"{prefix}_screenshot.png", bytes(rng.getrandbits(8) for _ in range(2048)))
+                continue
+            roll -= JUNK_RATIO
+            if roll < NO_URL_RATIO:
+                archive.writestr(f"{prefix}_website.html", "<html><body><p>I forgot the link</p></body></html>")
+                continue
+            roll -= NO_URL_RATIO
+            if roll < LOCAL_URL_RATIO:
+                archive.writestr(f"{prefix}_website.html", _url_file(rng, f"http://127.0.0.1:5500/{student}/index.html"))
+                continue
+            archive.writestr(f"{prefix}_website.html", _url_file(rng, f"{base_url}/s/{student}/index.html"))
+            gradable += 1
+
+        # Things Canvas zips pick up that aren't submissions at all
+        archive.writestr("notes.pdf", b"%PDF-1.4 benchmark junk")
+        archive.writestr("extra/nested_website.html", "<html></html>")
+    return gradable
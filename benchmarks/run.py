@@ -0,0 +1,157 @@
+# Benchmark runner
+#
+# Generates the corpus, starts the local site servers and, for each grader,
+# runs grading_setup + grade_extracted_files on the synthetic zip exactly as
+# main.py would, with a fresh results folder (so caches start cold). Each
+# grader runs in its own fresh process, so its peak RSS is its own and not
+# the highest of every grader run so far. Reports rows graded next to the
+# submissions that had a gradable site, students/sec, p50/p95 per-student
+# latency and peak RSS.
+#
+#   python -m benchmarks.run --students 200 --latency 0.05 --graders dungeon
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import graders
+import utilities
+from benchmarks.corpus import student_names, make_sites, make_submissions_zip
+from benchmarks.server import SiteServer, DEFAULT_HOST
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers (0 if it is empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+@contextlib.contextmanager
+def timed_submissions(latencies):
+    """Record how long grade_submission takes for each student."""
+    grade_submission = utilities.grade_submission
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return grade_submission(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    utilities.grade_submission = timed
+    try:
+        yield
+    finally:
+        utilities.grade_submission = grade_submission
+
+def run_grader(name, zip_path, workers, processes, verbose=False):
+    grading_function = graders.load(name)
+    results_path = tempfile.mkdtemp(prefix="grader-bench-")
+    latencies = []
+    output = io.StringIO()
+    try:
+        start = time.perf_counter()
+        with timed_submissions(latencies), contextlib.redirect_stdout(sys.stdout if verbose else output):
+            submissions = utilities.grading_setup(zip_path, results_path)
+            grading_tuples = utilities.grade_extracted_files(
+                grading_function, results_path, submissions, name, max_workers=workers, processes=processes)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(results_path, ignore_errors=True)
+
+    return {
+        'grader': name,
+        'students': len(grading_tuples),
+        'seconds': elapsed,
+        'students_per_sec': len(grading_tuples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_grader_in_process(name, zip_path, workers, processes, verbose=False):
+    """run_grader in a new interpreter, so peak RSS covers this grader alone."""
+    # (Worker processes started with --processes aren't included)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_grader, name, zip_path, workers, processes, verbose).result()
+
+def print_report(results):
+    print(f"{'grader':<20}{'students':>9}{'gradable':>9}{'seconds':>9}{'students/s':>12}{'p50 ms':>9}{'p95 ms':>9}{'peak RSS MB':>13}")
+    for result in results:
+        rss = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else "n/a"
+        print(f"{result['grader']:<20}{result['students']:>9}{result['gradable']:>9}{result['seconds']:>9.2f}{result['students_per_sec']:>12.1f}"
+              f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{rss:>13}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end grading throughput benchmark.")
+    parser.add_argument('--students', type=int, default=100, help="students in the synthetic class")
+    parser.add_argument('--pages', type=int, default=3, help="pages per student site")
+    parser.add_argument('--paragraphs', type=int, default=3, help="paragraphs per page (page size)")
+    parser.add_argument('--images', type=int, default=3, help="images per page")
+    parser.add_argument('--defect-rate', type=float, default=0.1, help="chance each rubric feature is left out")
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds the server waits before each response")
+    parser.add_argument('--graders', nargs='*', help="grader names to run (default: all)")
+    parser.add_argument('--workers', type=int, default=utilities.DEFAULT_WORKERS, help="concurrent students")
+    parser.add_argument('--processes', type=int, default=utilities.DEFAULT_PROCESSES, help="grading worker processes")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address the site servers listen on")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="show the graders' own output")
+    args = parser.parse_args(argv)
+
+    # The graders offered in main.py
+    grader_names = [name for name in graders.names() if not args.graders or name in args.graders]
+    if not grader_names:
+        parser.error(f"no such grader; choose from: {', '.join(graders.names())}")
+
+    students = student_names(args.students)
+    work_dir = tempfile.mkdtemp(prefix="grader-bench-corpus-")
+    try:
+        # External links point at a second server so they are on another host:port
+        with SiteServer({}, host=args.host, latency=args.latency) as external:
+            sites = make_sites(students, seed=args.seed, pages=args.pages, paragraphs=args.paragraphs,
+                               images=args.images, external_url=f"{external.base_url}/ext/link", defect_rate=args.defect_rate)
+            with SiteServer(sites, host=args.host, latency=args.latency) as server:
+                zip_path = os.path.join(work_dir, "submissions.zip")
+                gradable = make_submissions_zip(zip_path, students, server.base_url, seed=args.seed)
+                print(f"{len(students)} students ({gradable} with a gradable site), {len(sites)} pages, "
+                      f"{args.latency * 1000:.0f} ms latency, {args.workers} workers, {args.processes} processes")
+
+                results = []
+                for name in grader_names:
+                    result = run_grader_in_process(name, zip_path, args.workers, args.processes, args.verbose)
+                    # 'students' counts every row graded, including the junk files
+                    result['gradable'] = gradable
+                    results.append(result)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'settings': vars(args), 'results': results}, file, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
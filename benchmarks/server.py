@@ -0,0 +1,90 @@
+# Local stand-in for the web hosts students publish to
+#
+# Serves an in-memory {path: html} dict over HTTP/1.1 with keep-alive, adding a
+# fixed delay to every request to mimic a slow host. Any path under /ext/ answers
+# 200, so links to it count as working external links.
+#
+# The graders refuse URLs on localhost/127.0.0.1, so the server listens on
+# 127.0.0.2 by default. Linux routes all of 127.0.0.0/8 to loopback; on macOS
+# add the alias first (sudo ifconfig lo0 alias 127.0.0.2).
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_HOST = "127.0.0.2"
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, send_body):
+        time.sleep(self.server.latency)
+        path = self.path.split('?', 1)[0]
+        with self.server.lock:
+            self.server.requests.append((self.command, path))
+        if path.endswith('/'):
+            path += "index.html"
+        body = self.server.files.get(path)
+        if body is None and path.startswith("/ext/"):
+            body = b"<html><body>external</body></html>"
+        status = 200 if body is not None else 404
+        body = body if body is not None else b"not found"
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Every grading thread may connect at once
+
+class SiteServer:
+    """Serve files ({path: str or bytes}) on host:port in a background thread."""
+    def __init__(self, files, host=DEFAULT_HOST, port=0, latency=0.0):
+        self._server = _Server((host, port), _Handler)
+        self._server.files = {path: body.encode('utf-8') if isinstance(body, str) else body for path, body in files.items()}
+        self._server.latency = latency
+        self._server.requests = []  # (method, path) of every request, for inspection
+        self._server.lock = threading.Lock()
+        self._thread = None
+
+    def put(self, path, body):
+        """Add or replace one file while the server is running."""
+        self._server.files[path] = body.encode('utf-8') if isinstance(body, str) else body
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
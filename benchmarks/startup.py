@@ -0,0 +1,102 @@
+# Startup benchmark
+#
+# Imports the entry modules (main.py, grader_gui.py) in fresh interpreters and
+# reports how long the import takes, the slowest modules it pulled in
+# (python -X importtime) and whether any module that should only load on
+# demand (a grader, selenium, ...) was imported at startup. Exits non-zero when
+# that happens or an import goes over --max-ms, so it can guard against
+# startup regressions.
+#
+#   python -m benchmarks.startup --runs 5 --max-ms 800
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import graders
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULES = ['main', 'grader_gui']
+
+# Modules that must not be imported just by starting the tool
+LAZY_MODULES = ['selenium', 'pygetwindow', 'pandas', 'auto_canvas'] + [target.partition(':')[0] for target in graders.BUILTIN_GRADERS.values()]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}}))
+"""
+
+def import_once(module):
+    """Import module in a new interpreter; returns (seconds, loaded modules, importtime lines)."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module)],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result['seconds'], result['modules'], completed.stderr.splitlines()
+
+def slowest_imports(importtime_lines, module, count):
+    """The entry module's own imports by cumulative time, as (microseconds, name)."""
+    children = []
+    for line in importtime_lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        # Nested imports are listed (indented) before the module that made them
+        if depth == 0:
+            if name.strip() == module:
+                return sorted(children, reverse=True)[:count]
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return []
+
+def measure(module, runs):
+    times = []
+    for _ in range(runs):
+        seconds, modules, importtime_lines = import_once(module)
+        times.append(seconds)
+    eager = [name for name in LAZY_MODULES if name in modules]
+    return {
+        'module': module,
+        'median_ms': statistics.median(times) * 1000,
+        'min_ms': min(times) * 1000,
+        'modules': len(modules),
+        'eager': eager,
+        'slowest': slowest_imports(importtime_lines, module, 8),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how long the grader takes to start.")
+    parser.add_argument('--modules', nargs='*', default=ENTRY_MODULES, help="entry modules to import")
+    parser.add_argument('--runs', type=int, default=5, help="imports per module (the median is reported)")
+    parser.add_argument('--max-ms', type=float, help="fail if a median import takes longer than this")
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = [measure(module, max(1, args.runs)) for module in args.modules]
+    failed = False
+    for result in results:
+        print(f"{result['module']}: {result['median_ms']:.0f} ms median, {result['min_ms']:.0f} ms best, {result['modules']} modules")
+        for microseconds, name in result['slowest']:
+            print(f"  {microseconds / 1000:8.1f} ms  {name}")
+        if result['eager']:
+            failed = True
+            print(f"  loaded at startup: {', '.join(result['eager'])}")
+        if args.max_ms is not None and result['median_ms'] > args.max_ms:
+            failed = True
+            print(f"  over the {args.max_ms:.0f} ms limit")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'settings': vars(args), 'results': results}, file, indent=2)
+    if failed:
+        sys.exit(1)
+    return results
+
+if __name__ == "__main__":
+    main()
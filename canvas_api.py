@@ -0,0 +1,208 @@
+# Grade upload through the Canvas REST API
+#
+# An alternative to driving SpeedGrader with Selenium (auto_canvas.py). Grades
+# and comments are posted with the submissions bulk-update endpoint, many
+# students per request, with a few requests in flight at once under a rate
+# limit. Canvas applies each bulk update as a background job, which is polled
+# until it finishes. Needs an API access token (Canvas > Account > Settings >
+# New Access Token).
+#
+# Graders name students the way Canvas names submission files ("smithjohn"),
+# so the course roster is fetched and mapped onto those names first.
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+import requests
+import http_client
+
+TOKEN_ENV_VAR = 'CANVAS_API_TOKEN'
+
+BATCH_SIZE = 50  # Students per bulk-update request
+MAX_CONCURRENT = 4  # Bulk-update requests in flight at once
+REQUESTS_PER_SECOND = 5.0
+RATE_LIMIT_RETRIES = 5
+PROGRESS_POLL_INTERVAL = 0.5  # Seconds between checks on a bulk-update job
+PROGRESS_TIMEOUT = 120  # Seconds to wait for a bulk-update job
+PAGE_SIZE = 100
+
+# Outcome for one student. status is one of: 'updated', 'unchanged',
+# 'skipped' (already graded), 'not_found' (not on the roster) or 'failed'.
+GradeResult = namedtuple('GradeResult', ['student', 'canvas_name', 'user_id', 'status', 'message'])
+
+class CanvasAPIError(Exception):
+    pass
+
+def student_key(display_name):
+    """
+    Name key used to match Canvas students with graded submissions.
+
+    "John Michael Smith-Jones" becomes "michaelsmithjonesjohn": the middle
+    names, then the last name without hyphens, then the first name.
+    """
+    name_parts = display_name.split(" ")
+    if len(name_parts) < 2:
+        raise ValueError(f"Invalid name format: {display_name}")
+    first_name = name_parts[0]
+    last_name = name_parts[-1].replace("-", "")
+    middle_names = "".join(name_parts[1:-1])
+    return f"{middle_names.lower()}{last_name.lower()}{first_name.lower()}"
+
+def parse_speedgrader_url(speed_grader_url):
+    """Split a SpeedGrader URL into (Canvas base URL, course id, assignment id)."""
+    parsed = urlparse(speed_grader_url)
+    path_parts = parsed.path.strip('/').split('/')
+    assignment_ids = parse_qs(parsed.query).get('assignment_id')
+    if len(path_parts) < 2 or path_parts[0] != 'courses' or not assignment_ids:
+        raise ValueError(f"Not a SpeedGrader URL: {speed_grader_url}")
+    return f"{parsed.scheme}://{parsed.netloc}", path_parts[1], assignment_ids[0]
+
+class RateLimiter:
+    """Space requests out to at most `rate` per second across threads."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+class CanvasAPI:
+    def __init__(self, base_url, token, requests_per_second=REQUESTS_PER_SECOND):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Authorization': f"Bearer {token}"}
+        self.limiter = RateLimiter(requests_per_second)
+
+    def _request(self, method, url, **kwargs):
+        if not url.startswith('http'):
+            url = f"{self.base_url}/api/v1/{url.lstrip('/')}"
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.limiter.wait()
+            response = http_client.request(method, url, headers=self.headers, verify=True, **kwargs)
+            # Canvas answers 403 "Rate Limit Exceeded" when its request quota runs dry
+            throttled = response.status_code == 429 or (response.status_code == 403 and 'Rate Limit Exceeded' in response.text)
+            if not throttled or attempt == RATE_LIMIT_RETRIES:
+                break
+            time.sleep(2 ** attempt * 0.5)
+        if response.status_code >= 400:
+            raise CanvasAPIError(f"{method} {url} failed with {response.status_code}: {response.text[:200]}")
+        return response
+
+    def get_all(self, path, params=None):
+        """GET every page of a paginated list endpoint."""
+        params = dict(params or {}, per_page=PAGE_SIZE)
+        response = self._request('GET', path, params=params)
+        items = response.json()
+        while 'next' in response.links:
+            response = self._request('GET', response.links['next']['url'])
+            items.extend(response.json())
+        return items
+
+    def roster(self, course_id):
+        """Map student keys to Canvas users for the course's students."""
+        users = self.get_all(f"courses/{course_id}/users", {'enrollment_type[]': 'student'})
+        roster = {}
+        for user in users:
+            try:
+                roster[student_key(user['name'])] = user
+            except ValueError:
+                continue
+        return roster
+
+    def submissions(self, course_id, assignment_id):
+        """Current submissions for an assignment, by user id."""
+        submissions = self.get_all(f"courses/{course_id}/assignments/{assignment_id}/submissions")
+        return {submission['user_id']: submission for submission in submissions}
+
+    def update_grades(self, course_id, assignment_id, grades):
+        """
+        Post {user_id: (grade, comment)} as one bulk update and wait for it.
+        Returns the finished Progress object.
+        """
+        data = {}
+        for user_id, (grade, comment) in grades.items():
+            data[f"grade_data[{user_id}][posted_grade]"] = str(grade)
+            if comment:
+                data[f"grade_data[{user_id}][text_comment]"] = comment
+        progress = self._request('POST', f"courses/{course_id}/assignments/{assignment_id}/submissions/update_grades", data=data).json()
+        return self.wait_for_progress(progress)
+
+    def wait_for_progress(self, progress):
+        deadline = time.monotonic() + PROGRESS_TIMEOUT
+        while progress.get('workflow_state') not in ('completed', 'failed'):
+            if time.monotonic() > deadline:
+                raise CanvasAPIError(f"Bulk update {progress.get('id')} did not finish in {PROGRESS_TIMEOUT} seconds")
+            time.sleep(PROGRESS_POLL_INTERVAL)
+            progress = self._request('GET', progress['url']).json()
+        return progress
+
+def submit_grades(students, speed_grader_url, token, update_all=False, batch_size=BATCH_SIZE, max_concurrent=MAX_CONCURRENT):
+    """
+    Upload grades through the Canvas API.
+
+    students is the list of (student_name, grade, feedback) tuples the graders
+    produce, and speed_grader_url is the assignment's SpeedGrader URL. Like
+    putGradesIn, students who already have a grade are left alone unless
+    update_all is set, and grades that wouldn't change aren't posted.
+    Returns a list of GradeResult, one per student.
+    """
+    base_url, course_id, assignment_id = parse_speedgrader_url(speed_grader_url)
+    api = CanvasAPI(base_url, token)
+    roster = api.roster(course_id)
+    current = api.submissions(course_id, assignment_id)
+
+    results = []
+    to_update = {}  # user id -> (student name, grade, feedback)
+    handled = set()
+    for student_name, grade, feedback in students:
+        # A student with several tuples (on time and late) keeps the first, like putGradesIn
+        if student_name in handled:
+            continue
+        handled.add(student_name)
+        user = roster.get(student_name)
+        if user is None:
+            results.append(GradeResult(student_name, None, None, 'not_found', "No student with this name on the course roster."))
+            continue
+        submission = current.get(user['id'], {})
+        current_grade = submission.get('grade')
+        if current_grade is not None and str(current_grade) == str(grade):
+            results.append(GradeResult(student_name, user['name'], user['id'], 'unchanged', f"Grade already set to {current_grade}."))
+        elif current_grade is not None and not update_all:
+            results.append(GradeResult(student_name, user['name'], user['id'], 'skipped', f"Already graded ({current_grade})."))
+        else:
+            to_update.setdefault(user['id'], (student_name, grade, feedback))
+
+    user_ids = list(to_update)
+    batches = [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+
+    def post_batch(batch):
+        grades = {user_id: to_update[user_id][1:] for user_id in batch}
+        try:
+            progress = api.update_grades(course_id, assignment_id, grades)
+        except (CanvasAPIError, requests.exceptions.RequestException) as e:
+            return 'failed', str(e)
+        if progress.get('workflow_state') == 'failed':
+            return 'failed', progress.get('message') or "Canvas reported the bulk update as failed."
+        return 'updated', None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as executor:
+        for batch, (status, message) in zip(batches, executor.map(post_batch, batches)):
+            for user_id in batch:
+                student_name, grade, _ = to_update[user_id]
+                user = roster[student_name]
+                results.append(GradeResult(student_name, user['name'], user_id, status, message or f"Grade set to {grade}."))
+    return results
+
+def print_report(results):
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.status in ('not_found', 'failed'):
+            print(f"{result.student}: {result.status} - {result.message}")
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "No grades to submit.")
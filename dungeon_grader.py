@@ -1,75 +1,97 @@
-from bs4 import BeautifulSoup
 import requests
+from utilities import as_page
+from rubric import Rubric, Section, Rule
 
-# Function to grade a dungeon map URL
-def grade_dungeon_map(url, student_name, assignment_name):
-    feedback = []
-    total_score = 40  # Starting from full score
+# Bump when the rubric changes so stored results are regraded
+GRADER_VERSION = "1.1"
 
-    try:
-        # Fetch the website HTML with SSL verification disabled
-        response = requests.get(url, verify=False)
-        response.raise_for_status()
-        content = response.text
+def table(index):
+    def get(f):
+        tables = f.doc.find_all('table')
+        return tables[index] if len(tables) > index else None
+    return get
 
-        soup = BeautifulSoup(content, 'html.parser')
+def first_table_big(f):
+    # At least 5 rows, each of the first 5 with at least 5 cells
+    first_table = f['first_table']
+    rows = f.doc.find_all('tr', within=first_table)
+    return len(rows) >= 5 and all(f.doc.count(['td', 'th'], within=row) >= 5 for row in rows[:5])
 
-        # 1. Check for the 1st table (25 pts)
-        first_table = soup.find('table')
-        if first_table:
-            rows = first_table.find_all('tr')
-            if len(rows) >= 5 and all(len(row.find_all(['td', 'th'])) >= 5 for row in rows[:5]):
-                # Check for an image inside the table
-                image = first_table.find('img')
-                if not image:
-                    feedback.append("First table is missing an image. ~~ ")
-                    total_score -= 5
+def first_table_link_missing(f):
+    link = f.doc.find('a', within=f['first_table'], href=True)
+    return not link or "http" not in link['href']
 
-                # Check for at least 1 external link
-                link = first_table.find('a', href=True)
-                if not link or "http" not in link['href']:
-                    feedback.append("First table is missing an external link. ~~ ")
-                    total_score -= 5
+def first_table_styles_missing(f):
+    first_table = f['first_table']
+    return not (first_table.get('style') or any(cell.get('style') for cell in f.doc.find_all(['td', 'th'], within=first_table)))
 
-                # Check for background colors, font colors, or other styles
-                styles = first_table.get('style') or any(cell.get('style') for cell in first_table.find_all(['td', 'th']))
-                if not styles:
-                    feedback.append("First table is missing background or font styles. ~~ ")
-                    total_score -= 5
-            else:
-                feedback.append("First table does not have at least 5 rows and 5 columns. ~~ ")
-                total_score -= 10
-        else:
-            feedback.append("Missing the first table for the dungeon map~~")
-            total_score -= 25
+def second_table_ok(f):
+    # At least 6 rows, each with at least 2 cells
+    rows = f.doc.find_all('tr', within=f['second_table'])
+    return len(rows) >= 6 and all(f.doc.count(['td', 'th'], within=row) >= 2 for row in rows)
 
-        # 2. Check for the 2nd table (10 pts)
-        second_table = soup.find_all('table')[1] if len(soup.find_all('table')) > 1 else None
-        if second_table:
-            rows = second_table.find_all('tr')
-            if len(rows) >= 6 and all(len(row.find_all(['td', 'th'])) >= 2 for row in rows):
-                # Check if the top row is styled as a header
-                header = rows[0].find_all('th')
-                if not header:
-                    feedback.append("Second table is missing a styled header row~~")
-                    total_score -= 5
-            else:
-                feedback.append("Second table does not have at least 6 rows and 2 columns~~")
-                total_score -= 5
-        else:
-            feedback.append("Missing the second table for the key/legend~~")
-            total_score -= 10
+def second_table_header_missing(f):
+    first_row = f.doc.find('tr', within=f['second_table'])
+    return not f.doc.find_all('th', within=first_row)
 
-        # 3. Check for headings (5 pts)
-        headings = soup.find_all(['h1', 'h2', 'h3'])
-        second_table_heading = any(heading.find_next('table') == second_table for heading in headings) if second_table else False
+def second_table_heading_missing(f):
+    second_table = f['second_table']
+    if not second_table:
+        return True
+    # The nearest h1-h3 before the second table, with no other table in between
+    heading = f.doc.preceding(second_table, ['h1', 'h2', 'h3'])
+    if heading is None:
+        return True
+    table_before = f.doc.preceding(second_table, 'table')
+    return table_before is not None and f.doc.position(table_before) > f.doc.position(heading)
 
-        if not second_table_heading:
-            feedback.append("Ensure the second table has a corresponding heading before it. ~~")
-            total_score -= 5
+RUBRIC = Rubric(
+    name="dungeon map",
+    total=40,  # Starting from full score
+    facts={
+        'first_table': table(0),
+        'second_table': table(1),
+        'first_table_missing': lambda f: not f['first_table'],
+        'first_table_small': lambda f: bool(f['first_table']) and not first_table_big(f),
+        # Content checks only apply to a full-size first table
+        'first_table_checked': lambda f: bool(f['first_table']) and not f['first_table_small'],
+        'first_table_image_missing': lambda f: f['first_table_checked'] and not f.doc.find('img', within=f['first_table']),
+        'first_table_link_missing': lambda f: f['first_table_checked'] and first_table_link_missing(f),
+        'first_table_styles_missing': lambda f: f['first_table_checked'] and first_table_styles_missing(f),
+        'second_table_missing': lambda f: not f['second_table'],
+        'second_table_small': lambda f: bool(f['second_table']) and not second_table_ok(f),
+        'second_table_header_missing': lambda f: bool(f['second_table']) and not f['second_table_small'] and second_table_header_missing(f),
+        'second_table_heading_missing': second_table_heading_missing,
+    },
+    sections=[
+        # 1. First table (25 pts)
+        Section([
+            Rule('first_table_image_missing', 5, "First table is missing an image. ~~ "),
+            Rule('first_table_link_missing', 5, "First table is missing an external link. ~~ "),
+            Rule('first_table_styles_missing', 5, "First table is missing background or font styles. ~~ "),
+            Rule('first_table_small', 10, "First table does not have at least 5 rows and 5 columns. ~~ "),
+            Rule('first_table_missing', 25, "Missing the first table for the dungeon map~~"),
+        ]),
+        # 2. Second table (10 pts)
+        Section([
+            Rule('second_table_header_missing', 5, "Second table is missing a styled header row~~"),
+            Rule('second_table_small', 5, "Second table does not have at least 6 rows and 2 columns~~"),
+            Rule('second_table_missing', 10, "Missing the second table for the key/legend~~"),
+        ]),
+        # 3. Heading before the second table (5 pts)
+        Section([
+            Rule('second_table_heading_missing', 5, "Ensure the second table has a corresponding heading before it. ~~"),
+        ]),
+    ],
+)
 
+# Function to grade a dungeon map URL
+def grade_dungeon_map(page, student_name, assignment_name):
+    try:
+        # Use the prefetched page, or fetch it if we were handed a URL
+        page = as_page(page)
     except requests.exceptions.RequestException as e:
-        feedback.append(f"Failed to fetch website: {e}~~")
-        total_score = 0
+        return 0, [f"Failed to fetch website: {e}~~"]
 
-    return total_score, feedback
+    # Parse once; the rubric queries the shared element index
+    return RUBRIC.evaluate(page.parse())
@@ -2,23 +2,124 @@ import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import os
 import webbrowser
-from my_first_website_grader import grade_my_first_website
-from utilities import grading_setup, grade_extracted_files
-from auto_canvas import putGradesIn
-from dungeon_grader import grade_dungeon_map
-from test_part_2_grader import grade_html_test_part_2
-from my_first_webpage_grader import grade_my_first_webpage
-from my_second_webpage_grader import grade_my_second_webpage
+from utilities import grading_setup, grade_extracted_files, load_submission, submission_name
+import canvas_api
+import graders
 import threading
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+import link_checker
+import tracing
+import utilities
+from results_model import ResultsModel, COLUMNS
+
+# How often the Tk loop picks up results from the grading threads, and the
+# most it handles per tick so the window stays responsive
+RESULTS_POLL_MS = 100
+RESULTS_PER_TICK = 200
+
+# Rows of the results table built as widgets; the rest live in the ResultsModel
+VISIBLE_ROWS = 15
+LATE_FILTERS = {"All": None, "Late": True, "On time": False}
+
+class VirtualResultsView:
+    """
+    Treeview that only holds the rows on screen.
+
+    The rows themselves are in a ResultsModel; scrolling, filtering and
+    sorting change which slice of the model is copied into a fixed set of
+    Treeview items.
+    """
+    def __init__(self, parent, model, visible_rows=VISIBLE_ROWS):
+        self.model = model
+        self.visible_rows = visible_rows
+        self.offset = 0
+        self.shown_offset = 0
+        self.row_ids = []  # Model row number behind each Treeview item
+
+        self.tree = ttk.Treeview(parent, columns=COLUMNS, show="headings", height=visible_rows)
+        for column, title, width in (("Student", "Student Name", 150), ("Score", "Score", 50), ("Late", "Late", 40), ("Feedback", "Feedback", 500)):
+            self.tree.heading(column, text=title, command=lambda column=column: self.sort_by(column))
+            self.tree.column(column, width=width)
+        self.titles = {column: self.tree.heading(column, "text") for column in COLUMNS}
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.on_scrollbar)
+
+        # The Treeview never has more rows than fit, so scrolling is handled here
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, 'units') or "break")
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1, 'units') or "break")
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1, 'units') or "break")
+        self.tree.bind("<Prior>", lambda event: self.scroll(-1, 'pages') or "break")
+        self.tree.bind("<Next>", lambda event: self.scroll(1, 'pages') or "break")
+
+    def grid(self, row, column):
+        self.tree.grid(row=row, column=column, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=row, column=column + 1, sticky=(tk.N, tk.S))
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.model))
+            self.refresh()
+        else:
+            self.scroll(int(amount), unit)
+
+    def scroll(self, amount, unit):
+        self.offset += amount * (self.visible_rows if unit == 'pages' else 3)
+        self.refresh()
+
+    def sort_by(self, column):
+        order = self.model.sort_order
+        reverse = order is not None and order[0] == column and not order[1]
+        self.model.sort(column, reverse)
+        self.offset = 0
+        self.show_sort_order()
+        self.refresh()
+
+    def clear(self):
+        """Drop every row. The model forgets its sort order, so the headings do too."""
+        self.model.clear()
+        self.offset = 0
+        self.show_sort_order()
+
+    def show_sort_order(self):
+        # An arrow on the heading of the column the model is sorted by
+        order = self.model.sort_order
+        for name, title in self.titles.items():
+            arrow = (" \u25bc" if order[1] else " \u25b2") if order and order[0] == name else ""
+            self.tree.heading(name, text=title + arrow)
+
+    def refresh(self):
+        """Copy the visible slice of the model into the Treeview items."""
+        total = len(self.model)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        if self.offset != self.shown_offset:
+            # The items now show other students, so the selection would be wrong
+            self.tree.selection_remove(self.tree.selection())
+            self.shown_offset = self.offset
+        rows = self.model.rows(self.offset, self.offset + self.visible_rows)
+        items = self.tree.get_children()
+        for item in items[len(rows):]:
+            self.tree.delete(item)
+        for index, (row, (student, score, late, feedback)) in enumerate(rows):
+            values = (student, score, "Late" if late else "", feedback)
+            if index < len(items):
+                self.tree.item(items[index], values=values)
+            else:
+                self.tree.insert("", "end", values=values)
+        self.row_ids = [row for row, _ in rows]
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
 
-# Grading functions list
-grading_functions = [
-    ("my first webpage", grade_my_first_webpage),
-    ("my second webpage", grade_my_second_webpage),
-    ("my first website", grade_my_first_website),
-    ("dungeon", grade_dungeon_map),
-    ("html test", grade_html_test_part_2),
-]
+    def selected_row(self):
+        """The model row for the selected item, or None."""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        index = self.tree.index(selection[0])
+        return self.row_ids[index] if index < len(self.row_ids) else None
 
 class GradingApp:
     def __init__(self, root):
@@ -33,7 +134,29 @@ class GradingApp:
         self.canvas_url = tk.StringVar()
         self.username = tk.StringVar()  # New: Username variable
         self.password = tk.StringVar()  # New: Password variable
+        self.api_token = tk.StringVar(value=os.environ.get(canvas_api.TOKEN_ENV_VAR, ""))
+        self.submit_method = tk.StringVar(value="SpeedGrader")
+        self.browser_sessions = tk.IntVar(value=1)
+        self.record_trace = tk.BooleanVar(value=tracing.is_enabled())
+        self.trace_status = tk.StringVar()
+        self.progress_status = tk.StringVar()
+        self.filter_min_score = tk.StringVar()
+        self.filter_max_score = tk.StringVar()
+        self.filter_late = tk.StringVar(value="All")
+        self.filter_text = tk.StringVar()
+        self.filter_status = tk.StringVar()
+        self.results_model = ResultsModel()
         self.student_urls = {}
+        self.grading_tuples = []
+        self.grading_results = []
+        self.grading_total = 0
+        self.grading_started = 0.0
+        self.results_queue = queue.Queue()  # Messages from the grading threads
+        self.cancel_event = threading.Event()
+        self.canvas_session = None  # Logged-in browser kept between submissions
+
+        # Show per-student timings as they finish when tracing is on
+        tracing.add_listener(self.on_span)
 
         # Register Chrome explicitly
         self.chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
@@ -46,6 +169,7 @@ class GradingApp:
 
         # GUI Elements
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_widgets(self):
         # Frame for input fields
@@ -64,7 +188,7 @@ class GradingApp:
 
         # Grading function selection
         ttk.Label(input_frame, text="Grading Function:").grid(row=2, column=0, padx=5, pady=5)
-        grading_options = [name for name, _ in grading_functions]
+        grading_options = graders.names()
         self.grading_combo = ttk.Combobox(input_frame, textvariable=self.selected_grading_function, values=grading_options, state="readonly")
         self.grading_combo.grid(row=2, column=1, padx=5, pady=5)
         self.grading_combo.set(grading_options[0])
@@ -81,32 +205,51 @@ class GradingApp:
         ttk.Label(input_frame, text="Canvas Password:").grid(row=5, column=0, padx=5, pady=5)
         ttk.Entry(input_frame, textvariable=self.password, width=50, show="*").grid(row=5, column=1, padx=5, pady=5)
 
-        # Run grading button
-        ttk.Button(input_frame, text="Run Grading", command=self.start_grading).grid(row=6, column=1, pady=10)
+        # Canvas API token (masked); with a token, grades can be posted without a browser
+        ttk.Label(input_frame, text="Canvas API Token:").grid(row=9, column=0, padx=5, pady=5)
+        ttk.Entry(input_frame, textvariable=self.api_token, width=50, show="*").grid(row=9, column=1, padx=5, pady=5)
+        ttk.Combobox(input_frame, textvariable=self.submit_method, values=["SpeedGrader", "Canvas API"], state="readonly", width=12).grid(row=9, column=2, padx=5, pady=5)
+
+        # More than one SpeedGrader session runs headless browsers in parallel
+        ttk.Label(input_frame, text="Browser Sessions:").grid(row=10, column=0, padx=5, pady=5)
+        ttk.Spinbox(input_frame, from_=1, to=8, textvariable=self.browser_sessions, width=5).grid(row=10, column=1, padx=5, pady=5, sticky=tk.W)
 
-        # Progress bar
-        self.progress = ttk.Progressbar(input_frame, mode='indeterminate', length=200)
+        # Run grading button
+        self.run_button = ttk.Button(input_frame, text="Run Grading", command=self.start_grading)
+        self.run_button.grid(row=6, column=1, pady=10)
+        self.cancel_button = ttk.Button(input_frame, text="Cancel", command=self.cancel_grading, state='disabled')
+        self.cancel_button.grid(row=6, column=0, pady=10)
+        ttk.Checkbutton(input_frame, text="Record timing trace", variable=self.record_trace).grid(row=6, column=2, padx=5)
+        ttk.Label(input_frame, textvariable=self.trace_status).grid(row=8, column=1)
+
+        # Progress bar: students done out of the class, and how fast it's going
+        self.progress = ttk.Progressbar(input_frame, mode='determinate', length=200)
         self.progress.grid(row=7, column=1, pady=5)
         self.progress.grid_remove()
+        ttk.Label(input_frame, textvariable=self.progress_status).grid(row=7, column=2, padx=5)
 
         # Results frame
         results_frame = ttk.Frame(self.root, padding="10")
         results_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
-        # Treeview for results
-        self.tree = ttk.Treeview(results_frame, columns=("Student", "Score", "Feedback"), show="headings", height=15)
-        self.tree.heading("Student", text="Student Name")
-        self.tree.heading("Score", text="Score")
-        self.tree.heading("Feedback", text="Feedback")
-        self.tree.column("Student", width=150)
-        self.tree.column("Score", width=50)
-        self.tree.column("Feedback", width=500)
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-
-        # Scrollbar for Treeview
-        scrollbar = ttk.Scrollbar(results_frame, orient="vertical", command=self.tree.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Filters for the results table
+        filter_frame = ttk.Frame(results_frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        ttk.Label(filter_frame, text="Score from").grid(row=0, column=0, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.filter_min_score, width=5).grid(row=0, column=1, padx=2)
+        ttk.Label(filter_frame, text="to").grid(row=0, column=2, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.filter_max_score, width=5).grid(row=0, column=3, padx=2)
+        ttk.Combobox(filter_frame, textvariable=self.filter_late, values=list(LATE_FILTERS), state="readonly", width=8).grid(row=0, column=4, padx=5)
+        ttk.Label(filter_frame, text="Feedback contains").grid(row=0, column=5, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.filter_text, width=25).grid(row=0, column=6, padx=2)
+        ttk.Label(filter_frame, textvariable=self.filter_status).grid(row=0, column=7, padx=5)
+        for variable in (self.filter_min_score, self.filter_max_score, self.filter_late, self.filter_text):
+            variable.trace_add("write", lambda *args: self.apply_filter())
+
+        # Treeview for results; only the rows on screen are widgets
+        self.results_view = VirtualResultsView(results_frame, self.results_model)
+        self.results_view.grid(row=1, column=0)
+        self.tree = self.results_view.tree
 
         # Context menu for right-click
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -114,13 +257,30 @@ class GradingApp:
         self.tree.bind("<Button-3>", self.show_context_menu)
 
         # Submit to Canvas button
-        ttk.Button(results_frame, text="Submit to Canvas", command=self.submit_to_canvas).grid(row=1, column=0, pady=10)
+        ttk.Button(results_frame, text="Submit to Canvas", command=self.submit_to_canvas).grid(row=2, column=0, pady=10)
 
         # Make the window resizable
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(1, weight=1)
         input_frame.columnconfigure(1, weight=1)
         results_frame.columnconfigure(0, weight=1)
+        self.refresh_results()
+
+    def apply_filter(self):
+        def score(variable):
+            try:
+                return float(variable.get())
+            except ValueError:
+                return None  # Blank or not a number: no limit
+        self.results_model.set_filter(score(self.filter_min_score), score(self.filter_max_score),
+                                      LATE_FILTERS.get(self.filter_late.get()), self.filter_text.get())
+        self.results_view.offset = 0
+        self.refresh_results()
+
+    def refresh_results(self):
+        self.results_view.refresh()
+        shown, total = len(self.results_model), self.results_model.total
+        self.filter_status.set(f"{shown} of {total} shown" if shown != total else f"{total} students")
 
     def browse_zip(self):
         file_path = filedialog.askopenfilename(filetypes=[("Zip files", "*.zip")])
@@ -145,56 +305,144 @@ class GradingApp:
             messagebox.showerror("Error", "The selected zip file does not exist.")
             return
 
+        if self.record_trace.get():
+            tracing.enable()
+        else:
+            tracing.disable()
+        self.trace_status.set("")
+
+        # Results from the last run are cleared here, on the Tk thread
+        self.results_view.clear()
+        self.apply_filter()
+        self.grading_tuples = []
+        self.results_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.grading_results = []  # (file order, grading tuple) as they arrive
+        self.grading_total = 0
+        self.grading_started = time.monotonic()
+
+        self.progress.config(value=0, maximum=1)
         self.progress.grid()
-        self.progress.start()
-        self.root.children['!frame'].children['!button3'].config(state='disabled')
-        threading.Thread(target=self.run_grading, args=(uploaded_file, results_folder, grading_func_name), daemon=True).start()
-
-    def run_grading(self, uploaded_file, results_folder, grading_func_name):
+        self.progress_status.set("Reading submissions...")
+        self.run_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        threading.Thread(target=self.run_grading, args=(uploaded_file, results_folder, grading_func_name, self.results_queue, self.cancel_event), daemon=True).start()
+        self.root.after(RESULTS_POLL_MS, self.drain_results)
+
+    def cancel_grading(self):
+        # Students already being fetched finish; the rest are never started
+        self.cancel_event.set()
+        self.cancel_button.config(state='disabled')
+        self.progress_status.set("Cancelling...")
+
+    def run_grading(self, uploaded_file, results_folder, grading_func_name, results_queue, cancel_event):
+        # Runs on a background thread; everything for the window goes through results_queue
         try:
-            self.tree.delete(*self.tree.get_children())
             extracted_files = grading_setup(uploaded_file, results_folder)
-            grading_function = next(func for name, func in grading_functions if name == grading_func_name)
-            grading_tuples = self.grade_extracted_files_with_urls(grading_function, results_folder, extracted_files, grading_func_name)
-            self.root.after(0, lambda: self.display_results(grading_tuples))
+            grading_function = graders.load(grading_func_name)
+            results_queue.put(('total', len(extracted_files)))
+            self.grade_extracted_files_with_urls(grading_function, results_folder, extracted_files, grading_func_name, results_queue, cancel_event)
+            # Keep the external-link results for the next run, as grade_extracted_files does
+            with tracing.span('save_caches'):
+                link_checker.save()
+            trace_path = tracing.export(os.path.join(results_folder, "csv", tracing.TRACE_FILE))
+            results_queue.put(('finished', trace_path and f"Trace saved to {trace_path}\n\n{tracing.format_summary()}"))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred during grading: {str(e)}"))
-        finally:
-            self.root.after(0, self.stop_progress)
-
-    def grade_extracted_files_with_urls(self, grading_function, results_path, extracted_files, assignment_name):
-        grading_tuples = []
-        pulled_path = os.path.join(results_path, "pulled_html")
-        for file_name in extracted_files:
-            file_path = os.path.join(pulled_path, file_name)
-            if os.path.isdir(file_path):
-                continue
-
+            results_queue.put(('error', f"An error occurred during grading: {str(e)}"))
+
+    def grade_extracted_files_with_urls(self, grading_function, results_path, extracted_files, assignment_name, results_queue, cancel_event):
+        def grade(index, submission):
+            if cancel_event.is_set():
+                return
+            student_name = submission_name(submission).split('_')[0]
+            url = None
+            with tracing.span('student', student=student_name):
+                try:
+                    loaded = load_submission(results_path, submission)
+                    if loaded is None:
+                        results_queue.put(('skipped',))
+                        return
+                    url = extract_url_from_markup(loaded[1])
+                    if not url or "localhost" in url or "127.0.0.1" in url:
+                        feedback = "Invalid or local URL submitted."
+                        score = 1
+                        url = None
+                    else:
+                        score, feedback = grading_function(url, student_name, assignment_name)
+                        feedback = "; ".join(feedback) if feedback else "Good job!"
+                    grading_tuple = (student_name, score, feedback)
+                except Exception as e:
+                    grading_tuple = (student_name, 1, f"Error processing: {str(e)}")
+            results_queue.put(('result', index, grading_tuple, url, "_LATE_" in submission_name(submission)))
+
+        # Students are graded a few at a time so one slow host doesn't hold up the rest
+        with ThreadPoolExecutor(max_workers=utilities.DEFAULT_WORKERS) as executor:
+            for index, submission in enumerate(extracted_files):
+                executor.submit(grade, index, submission)
+
+    def on_span(self, span):
+        # Called from the grading threads; the Tk loop shows it
+        if span.name == 'student':
+            self.results_queue.put(('status', f"{span.attrs.get('student', '')}: {span.duration * 1000:.0f} ms"))
+
+    def drain_results(self):
+        """Show whatever the grading threads have finished since the last tick."""
+        finished = None
+        for _ in range(RESULTS_PER_TICK):
             try:
-                url = extract_url_from_html(file_path)
-                student_name = file_name.split('_')[0]
-                if not url or "localhost" in url or "127.0.0.1" in url:
-                    feedback = "Invalid or local URL submitted."
-                    score = 1
-                else:
-                    score, feedback = grading_function(url, student_name, assignment_name)
-                    feedback = "; ".join(feedback) if feedback else "Good job!"
-                    self.student_urls[student_name] = url
-                grading_tuples.append((student_name, score, feedback))
-            except Exception as e:
-                grading_tuples.append((student_name, 1, f"Error processing: {str(e)}"))
-        return grading_tuples
-
-    def display_results(self, grading_tuples):
-        for student_name, score, feedback in grading_tuples:
-            self.tree.insert("", "end", values=(student_name, score, feedback))
-        self.grading_tuples = grading_tuples
-        messagebox.showinfo("Success", "Grading completed successfully. Results are displayed below.")
+                message = self.results_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == 'total':
+                self.grading_total = message[1]
+                self.progress.config(maximum=max(1, message[1]))
+            elif kind == 'result':
+                _, index, grading_tuple, url, is_late = message
+                self.grading_results.append((index, grading_tuple))
+                self.results_model.append(*grading_tuple, late=is_late)
+                if url:
+                    self.student_urls[grading_tuple[0]] = url
+                self.progress.step(1)
+            elif kind == 'skipped':
+                self.progress.step(1)
+            elif kind == 'status':
+                self.trace_status.set(message[1])
+            else:
+                finished = message
+                break
+        self.refresh_results()
+        if finished:
+            self.finish_grading(*finished)
+        else:
+            self.update_progress_status()
+            self.root.after(RESULTS_POLL_MS, self.drain_results)
+
+    def update_progress_status(self):
+        if not self.grading_total:
+            return
+        done = int(self.progress['value'])
+        elapsed = time.monotonic() - self.grading_started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self.progress_status.set(f"{done}/{self.grading_total} students, {rate:.1f}/s")
+
+    def finish_grading(self, kind, message):
+        self.grading_tuples = [grading_tuple for _, grading_tuple in sorted(self.grading_results)]
+        self.update_progress_status()
+        self.stop_progress()
+        if kind == 'error':
+            messagebox.showerror("Error", message)
+        elif self.cancel_event.is_set():
+            messagebox.showinfo("Cancelled", f"Grading cancelled after {len(self.grading_tuples)} of {self.grading_total} students.")
+        else:
+            messagebox.showinfo("Success", "Grading completed successfully. Results are displayed below.")
+            if message:
+                messagebox.showinfo("Timing", message)
 
     def stop_progress(self):
-        self.progress.stop()
         self.progress.grid_remove()
-        self.root.children['!frame'].children['!button3'].config(state='normal')
+        self.run_button.config(state='normal')
+        self.cancel_button.config(state='disabled')
 
     def submit_to_canvas(self):
         if not hasattr(self, 'grading_tuples') or not self.grading_tuples:
@@ -210,12 +458,41 @@ class GradingApp:
             return
 
         try:
-            # Pass username and password to putGradesIn if provided
-            putGradesIn(self.grading_tuples, canvas_url, username, password)
-            messagebox.showinfo("Success", "Grades submitted to Canvas successfully.")
+            if self.submit_method.get() == "Canvas API":
+                token = self.api_token.get()
+                if not token:
+                    messagebox.showerror("Error", "Please enter a Canvas API token.")
+                    return
+                results = canvas_api.submit_grades(list(self.grading_tuples), canvas_url, token)
+            else:
+                # Selenium is only loaded when grades go through SpeedGrader
+                from auto_canvas import putGradesIn, CanvasSession
+                # Reuse the browser from the last submission so Canvas only asks to log in once
+                if self.canvas_session is None:
+                    self.canvas_session = CanvasSession()
+                results = putGradesIn(self.grading_tuples, canvas_url, username, password, sessions=self.browser_sessions.get(), session=self.canvas_session)
+            self.show_submit_report(results)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to submit grades to Canvas: {str(e)}")
 
+    def on_close(self):
+        if self.canvas_session is not None:
+            self.canvas_session.close()
+        self.root.destroy()
+
+    def show_submit_report(self, results):
+        counts = {}
+        problems = []
+        for result in results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+            if result.status in ('not_found', 'failed'):
+                problems.append(f"{result.student}: {result.message}")
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        if problems:
+            messagebox.showwarning("Canvas", summary + "\n\n" + "\n".join(problems[:20]))
+        else:
+            messagebox.showinfo("Success", f"Grades submitted to Canvas: {summary}.")
+
     def show_context_menu(self, event):
         item = self.tree.identify_row(event.y)
         if item:
@@ -223,9 +500,9 @@ class GradingApp:
             self.context_menu.post(event.x_root, event.y_root)
 
     def view_url_in_chrome(self):
-        selected_item = self.tree.selection()
-        if selected_item:
-            student_name = self.tree.item(selected_item, "values")[0]
+        row = self.results_view.selected_row()
+        if row is not None:
+            student_name = self.results_model.row(row)[0]
             url = self.student_urls.get(student_name)
             if url:
                 try:
@@ -239,11 +516,9 @@ class GradingApp:
             else:
                 messagebox.showinfo("No URL", f"No valid URL found for {student_name}.")
 
-def extract_url_from_html(file_path):
-    from bs4 import BeautifulSoup
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    soup = BeautifulSoup(content, 'html.parser')
+def extract_url_from_markup(content):
+    from html_parsers import make_soup
+    soup = make_soup(content)
     meta_refresh = soup.find('meta', attrs={'http-equiv': 'Refresh'})
     if meta_refresh:
         return meta_refresh.get('content').split('url=')[-1].strip()
@@ -256,4 +531,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Required for the grading worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
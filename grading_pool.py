@@ -0,0 +1,98 @@
+# Process pool for the CPU-bound half of grading
+#
+# Fetching is network wait and runs on threads, but parsing and rubric checks
+# are pure Python and serialize on the GIL. GradingPool hands each fetched page
+# to a worker process and returns (score, feedback) to the calling thread.
+#
+# The pool always uses the "spawn" start method so it behaves the same on
+# Windows, macOS and Linux and inside the PyInstaller bundle (the entry points
+# call multiprocessing.freeze_support()). Everything sent to a worker must be
+# picklable: graders are module-level functions and FetchedPage drops its
+# parse cache when pickled.
+#
+# Workers load the parent's saved link-check results, and the links each
+# worker probes are sent back with its scores and merged into the parent's
+# checker, which saves them at the end of the run.
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import http_client
+import html_parsers
+import link_checker
+
+def _init_worker(parser_name, cache_directory, cache_ttl, link_cache_path, link_ttl):
+    # Match the parent's parser, HTTP cache and link checker settings
+    html_parsers.set_parser(parser_name)
+    if cache_directory:
+        http_client.enable_cache(cache_directory, ttl=cache_ttl)
+    link_checker.configure(link_cache_path, link_ttl)
+
+def _grade_in_worker(grading_function, page, student_name, assignment_name):
+    start = time.perf_counter()
+    score, feedback = grading_function(page, student_name, assignment_name)
+    return score, feedback, os.getpid(), time.perf_counter() - start, link_checker.take_checked()
+
+def _grade_many_in_worker(grading_functions, page, student_name):
+    # The page is parsed once here and shared by every rubric
+    start = time.perf_counter()
+    outcomes = {}
+    for name, grading_function in grading_functions.items():
+        try:
+            outcomes[name] = grading_function(page, student_name, name)
+        except Exception as e:
+            outcomes[name] = e
+    return outcomes, os.getpid(), time.perf_counter() - start, link_checker.take_checked()
+
+class GradingPool:
+    def __init__(self, processes):
+        cache = http_client.get_cache()
+        checker = link_checker.get_checker()
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(html_parsers.get_parser(), cache.directory if cache else None, cache.ttl if cache else 0,
+                      checker.cache_path, checker.ttl),
+        )
+        self.stats = {}  # Worker pid -> [students graded, seconds spent grading]
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def grade(self, grading_function, page, student_name, assignment_name):
+        """Grade one page in a worker process. Blocks the calling thread until done."""
+        future = self.executor.submit(_grade_in_worker, grading_function, page, student_name, assignment_name)
+        score, feedback, pid, elapsed, checked = future.result()
+        self._record(pid, elapsed, checked)
+        return score, feedback
+
+    def grade_many(self, grading_functions, page, student_name):
+        """
+        Grade one page with several {rubric name: grading function} in one
+        worker. Returns {rubric name: (score, feedback) or the exception raised}.
+        """
+        future = self.executor.submit(_grade_many_in_worker, grading_functions, page, student_name)
+        outcomes, pid, elapsed, checked = future.result()
+        self._record(pid, elapsed, checked)
+        return outcomes
+
+    def _record(self, pid, elapsed, checked):
+        if checked:
+            link_checker.add_checked(checked)
+        with self._lock:
+            worker = self.stats.setdefault(pid, [0, 0.0])
+            worker[0] += 1
+            worker[1] += elapsed
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def report(self):
+        """Print how many students each worker graded and its throughput."""
+        wall = time.perf_counter() - self._started
+        total = sum(students for students, _ in self.stats.values())
+        print(f"Graded {total} page(s) in {len(self.stats)} worker process(es) over {wall:.1f}s")
+        for number, (pid, (students, busy)) in enumerate(sorted(self.stats.items()), start=1):
+            rate = students / busy if busy else 0.0
+            print(f"  Worker {number} (pid {pid}): {students} page(s), {busy:.2f}s busy, {rate:.1f} pages/s")
@@ -0,0 +1,163 @@
+# Persistent on-disk cache for fetched pages
+#
+# Each cached response is stored as two files named after a hash of the
+# normalized URL: <key>.body holds the raw bytes and <key>.json the metadata
+# (ETag, Last-Modified, encoding, timestamps). Entries younger than the TTL are
+# served without touching the network; older ones are revalidated with a
+# conditional request so an unchanged page only costs a 304.
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TTL = 0  # Seconds an entry is trusted before revalidating (0 = always revalidate)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # Evict least recently used entries above this size
+
+# Response headers worth keeping alongside the body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+def normalize_url(url):
+    """Normalize a URL for use as a cache key (case, default ports, fragments)."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    path = parts.path or '/'
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+# Write through a temporary file so readers never see a half-written entry
+def _atomic_write(path, data):
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+class HTTPCache:
+    def __init__(self, directory, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = {}  # key -> metadata dict
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name), 'r', encoding='utf-8') as file:
+                    meta = json.load(file)
+                self._index[file_name[:-5]] = meta
+            except (OSError, ValueError):
+                continue
+
+    def _key(self, url):
+        return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def _write_meta(self, key, meta):
+        meta_path, _ = self._paths(key)
+        _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def lookup(self, url):
+        """Return the cached metadata for a URL, or None."""
+        with self._lock:
+            meta = self._index.get(self._key(url))
+            return dict(meta) if meta else None
+
+    def is_fresh(self, meta):
+        return time.time() - meta['fetched_at'] < self.ttl
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta['headers'].get('ETag'):
+            headers['If-None-Match'] = meta['headers']['ETag']
+        if meta['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+        return headers
+
+    def load_response(self, url, meta):
+        """Rebuild a requests Response from a cache entry and mark it as used."""
+        key = self._key(url)
+        _, body_path = self._paths(key)
+        try:
+            with open(body_path, 'rb') as file:
+                content = file.read()
+        except OSError:
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index[key]['last_used'] = time.time()
+                self._write_meta(key, self._index[key])
+
+        response = Response()
+        response._content = content
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = meta['final_url']
+        response.encoding = meta['encoding']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.from_cache = True
+        return response
+
+    def revalidated(self, url):
+        """Record that the server confirmed (304) the cached copy is still current."""
+        key = self._key(url)
+        with self._lock:
+            if key in self._index:
+                self._index[key]['fetched_at'] = time.time()
+                self._write_meta(key, self._index[key])
+
+    def store(self, url, response):
+        if response.status_code != 200:
+            return
+        key = self._key(url)
+        _, body_path = self._paths(key)
+        now = time.time()
+        meta = {
+            'url': normalize_url(url),
+            'final_url': response.url,
+            'encoding': response.encoding,
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            'size': len(response.content),
+            'fetched_at': now,
+            'last_used': now,
+        }
+        with self._lock:
+            try:
+                _atomic_write(body_path, response.content)
+                self._write_meta(key, meta)
+            except OSError as e:
+                print(f"Error writing HTTP cache entry: {e}")
+                return
+            self._index[key] = meta
+            self._evict()
+
+    def _evict(self):
+        # Caller holds the lock
+        total = sum(meta['size'] for meta in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, meta in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self._index[key]
+            total -= meta['size']
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,128 @@
+# Shared HTTP client used by the graders and utilities
+#
+# Every request goes through one pooled requests.Session so connections to the
+# handful of hosts students use are kept alive and reused. Requests get a
+# timeout so a hung host can't freeze a run, and transient errors are retried
+# with backoff.
+import threading
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from http_cache import HTTPCache, DEFAULT_TTL, DEFAULT_MAX_BYTES
+
+# Suppress InsecureRequestWarning (student hosts are fetched with verify=False)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+DEFAULT_TIMEOUT = (5, 20)  # (connect, read) seconds
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5  # Seconds, doubled on each retry
+DEFAULT_POOL_SIZE = 10  # Connections kept open per host
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_settings = {
+    'timeout': DEFAULT_TIMEOUT,
+    'retries': DEFAULT_RETRIES,
+    'backoff': DEFAULT_BACKOFF,
+    'pool_size': DEFAULT_POOL_SIZE,
+}
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+
+def configure(timeout=None, retries=None, backoff=None, pool_size=None):
+    """Change client settings. The session is rebuilt on the next request."""
+    global _session
+    with _session_lock:
+        if timeout is not None:
+            _settings['timeout'] = timeout
+        if retries is not None:
+            _settings['retries'] = retries
+        if backoff is not None:
+            _settings['backoff'] = backoff
+        if pool_size is not None:
+            _settings['pool_size'] = pool_size
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def _build_session():
+    retry = Retry(
+        total=_settings['retries'],
+        connect=_settings['retries'],
+        read=_settings['retries'],
+        status=_settings['retries'],
+        backoff_factor=_settings['backoff'],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,  # Hand back the last response so raise_for_status() works
+    )
+    adapter = HTTPAdapter(
+        pool_connections=50,
+        pool_maxsize=_settings['pool_size'],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.verify = False
+    return session
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def request(method, url, **kwargs):
+    kwargs.setdefault('timeout', _settings['timeout'])
+    kwargs.setdefault('verify', False)
+    return get_session().request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    # Streamed and custom-header requests (e.g. ranged probes) skip the cache
+    if _cache is None or kwargs.get('stream') or kwargs.get('headers'):
+        return request('GET', url, **kwargs)
+
+    cache = _cache
+    meta = cache.lookup(url)
+    if meta and cache.is_fresh(meta):
+        response = cache.load_response(url, meta)
+        if response is not None:
+            return response
+        meta = None
+
+    headers = cache.conditional_headers(meta) if meta else {}
+    response = request('GET', url, headers=headers, **kwargs)
+    if response.status_code == 304 and meta:
+        cached = cache.load_response(url, meta)
+        if cached is not None:
+            cache.revalidated(url)
+            return cached
+        # The body vanished from disk, so fetch it again unconditionally
+        response = request('GET', url, **kwargs)
+    cache.store(url, response)
+    return response
+
+def head(url, **kwargs):
+    kwargs.setdefault('allow_redirects', True)
+    return request('HEAD', url, **kwargs)
+
+def enable_cache(directory, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+    """Serve GET requests from a persistent cache in `directory`."""
+    global _cache
+    _cache = HTTPCache(directory, ttl=ttl, max_bytes=max_bytes)
+    return _cache
+
+def get_cache():
+    return _cache
+
+def disable_cache():
+    global _cache
+    _cache = None
+
+def close():
+    """Close pooled connections, e.g. at the end of a run."""
+    configure()
@@ -0,0 +1,147 @@
+# Shared liveness checks for external links
+#
+# Graders only need to know whether an external link works, not its content.
+# A link is probed with HEAD first and, if the server doesn't like HEAD, with a
+# one-byte ranged GET that is streamed and closed straight away. Results are
+# cached by normalized URL for the whole run, concurrent checks of the same URL
+# wait on a single in-flight probe, and working links are persisted to disk
+# with a TTL so later runs don't probe them again.
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+import requests
+import http_client
+import tracing
+from http_cache import normalize_url
+
+DEFAULT_TTL = 24 * 60 * 60  # Seconds a working link is trusted across runs
+LINK_CACHE_FILE = "link_cache.json"
+
+def probe(url):
+    """Return True if the URL answers with a non-error status."""
+    try:
+        response = http_client.head(url)
+        response.close()
+        if response.status_code < 400:
+            return True
+    except requests.exceptions.RequestException:
+        pass
+
+    # Some servers reject or mishandle HEAD; ask for a single byte instead
+    try:
+        with http_client.get(url, stream=True, headers={'Range': 'bytes=0-0'}) as response:
+            # 416 means the resource exists but is empty
+            return response.status_code < 400 or response.status_code == 416
+    except requests.exceptions.RequestException:
+        return False
+
+class LinkChecker:
+    def __init__(self, cache_path=None, ttl=DEFAULT_TTL):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Several grading runs can share one checker
+        self._results = {}  # Normalized URL -> {'ok': bool, 'checked_at': timestamp}
+        self._in_flight = {}  # Normalized URL -> Future shared by concurrent callers
+        self._checked = {}  # Probed since the last take_checked(), for handing to another process
+        self._dirty = False
+        if cache_path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in stored.items():
+            if now - entry['checked_at'] < self.ttl:
+                self._results[key] = entry
+
+    def is_reachable(self, url):
+        key = normalize_url(url)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                return cached['ok']
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            return future.result()
+
+        ok = False
+        try:
+            with tracing.span('link_check', host=urlparse(url).netloc) as span:
+                ok = probe(url)
+                span.set(ok=ok)
+        finally:
+            with self._lock:
+                self._results[key] = self._checked[key] = {'ok': ok, 'checked_at': time.time()}
+                self._dirty = self._dirty or ok
+                del self._in_flight[key]
+            future.set_result(ok)
+        return ok
+
+    def take_checked(self):
+        """Results probed since the last call, as {normalized URL: entry}."""
+        with self._lock:
+            checked, self._checked = self._checked, {}
+        return checked
+
+    def add_checked(self, checked):
+        """Adopt results another process probed (see take_checked)."""
+        with self._lock:
+            for key, entry in checked.items():
+                if key not in self._results:
+                    self._results[key] = entry
+                    self._dirty = self._dirty or entry['ok']
+
+    def save(self):
+        """Persist working links. Failures are only remembered for this run."""
+        if not self.cache_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                working = {key: entry for key, entry in self._results.items() if entry['ok']}
+                self._dirty = False
+            temp_path = self.cache_path + '.tmp'
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    json.dump(working, file)
+                os.replace(temp_path, self.cache_path)
+            except OSError as e:
+                print(f"Error saving link cache: {e}")
+
+# Checker shared by every grader in the process
+_checker = LinkChecker()
+
+def configure(cache_path=None, ttl=DEFAULT_TTL):
+    """Start a fresh shared checker, optionally persisted to cache_path."""
+    global _checker
+    _checker = LinkChecker(cache_path, ttl)
+    return _checker
+
+def get_checker():
+    return _checker
+
+def is_reachable(url):
+    return _checker.is_reachable(url)
+
+def save():
+    _checker.save()
+
+def take_checked():
+    return _checker.take_checked()
+
+def add_checked(checked):
+    _checker.add_checked(checked)
@@ -1,18 +1,9 @@
-from my_first_website_grader import grade_my_first_website
+import multiprocessing
+import getpass
+import os
 from utilities import grading_setup, grade_extracted_files
-from auto_canvas import putGradesIn
-from dungeon_grader import grade_dungeon_map
-from test_part_2_grader import grade_html_test_part_2
-from my_first_webpage_grader import grade_my_first_webpage
-from my_second_webpage_grader import grade_my_second_webpage
-
-grading_functions = [
-    ("my first webpage", grade_my_first_webpage),
-    ("my second webpage", grade_my_second_webpage),
-    ("my first website", grade_my_first_website),
-    ("dungeon", grade_dungeon_map),
-    ("html test", grade_html_test_part_2),
-]
+import canvas_api
+import graders
 
 def main():
     # Input paths
@@ -23,29 +14,60 @@ def main():
     extracted_files = grading_setup(uploaded_file_path, results_path)
 
     # Display grading function options
+    grader_names = graders.names()
     print("Available grading functions:")
-    for idx, (name, _) in enumerate(grading_functions, start=1):
+    for idx, name in enumerate(grader_names, start=1):
         print(f"{idx}. {name}")
 
-    # Prompt user to select a grading function
+    # Prompt user to select a grading function; with several, each page is
+    # fetched once and graded under all of them
     try:
-        selection = int(input("Enter the number of the grading function to use: "))
-        if selection < 1 or selection > len(grading_functions):
+        selections = [int(part) for part in input("Enter the number of the grading function to use (or several, e.g. 2,5): ").split(",")]
+        if any(selection < 1 or selection > len(grader_names) for selection in selections):
             raise ValueError("Invalid selection.")
     except ValueError as e:
         print(f"Error: {e}")
         return
 
-    # Get the selected grading function
-    grading_function = grading_functions[selection - 1][1]
+    # Get the selected grading functions (only these graders are imported)
+    assignment_names = list(dict.fromkeys(grader_names[selection - 1] for selection in selections))
+    assignment_name = assignment_names[0]
 
     # Grade the extracted files
-    grading_tuples = grade_extracted_files(grading_function, results_path, extracted_files, grading_functions[selection - 1][0])
+    if len(assignment_names) == 1:
+        grading_tuples = grade_extracted_files(graders.load(assignment_name), results_path, extracted_files, assignment_name)
+    else:
+        rubric_tuples = grade_extracted_files({name: graders.load(name) for name in assignment_names}, results_path, extracted_files, "+".join(assignment_names))
+        # Canvas takes one grade per student, so pick which rubric to send
+        for idx, name in enumerate(assignment_names, start=1):
+            print(f"{idx}. {name}")
+        choice = input("Enter the number of the rubric whose grades go to Canvas [1]: ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(assignment_names):
+            assignment_name = assignment_names[int(choice) - 1]
+        grading_tuples = rubric_tuples[assignment_name]
 
-    # Submit grades to Canvas
-    putGradesIn(grading_tuples)
+    # Submit grades to Canvas, through the API if a token is at hand or through SpeedGrader in Chrome
+    method = input("Submit grades with the Canvas API or SpeedGrader? (api/speedgrader) [speedgrader]: ").strip().lower()
+    if method == "api":
+        speed_grader_url = input("What is the URL of the SpeedGrader you want to interact with?\n")
+        token = os.environ.get(canvas_api.TOKEN_ENV_VAR) or getpass.getpass("Canvas API token: ")
+        results = canvas_api.submit_grades(grading_tuples, speed_grader_url, token)
+    else:
+        # Selenium is only loaded when grades go through SpeedGrader
+        from auto_canvas import putGradesIn, CanvasSession
+        sessions = input("Browser sessions to split the students across (more than 1 run headless) [1]: ").strip()
+        # One browser for every SpeedGrader (e.g. each section), logged in once
+        with CanvasSession() as session:
+            while True:
+                results = putGradesIn(grading_tuples, sessions=int(sessions) if sessions.isdigit() else 1, session=session)
+                if input("Submit these grades to another SpeedGrader too? (y/n): ").strip().lower() != "y":
+                    break
+                canvas_api.print_report(results)
+    canvas_api.print_report(results)
 
     print("Grading complete. Results submitted to Canvas.")
 
 if __name__ == "__main__":
+    # Required for the grading worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
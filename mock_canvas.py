@@ -0,0 +1,318 @@
+# Local stand-in for the parts of Canvas the grade uploaders use
+#
+# Serves a fake course over HTTP so canvas_api.py can be exercised without a
+# real Canvas instance or token:
+#   GET  /api/v1/courses/:course/users                  (paginated roster)
+#   GET  /api/v1/courses/:course/assignments/:a/submissions
+#   POST /api/v1/courses/:course/assignments/:a/submissions/update_grades
+#   GET  /api/v1/progress/:id                           (bulk-update jobs)
+# Bulk updates finish after `job_delay` seconds. With `max_concurrent` set,
+# API requests beyond that many in flight get Canvas's 403 "Rate Limit Exceeded".
+#
+# It also serves a bare-bones SpeedGrader for the Selenium uploader
+# (auto_canvas.py): a login form, then one page per student with the same
+# element ids and classes the uploader looks for. Grades and comments entered
+# there land in the same course data as API uploads.
+#
+#   python mock_canvas.py --students 150
+import argparse
+import html
+import json
+import secrets
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse, parse_qs, quote
+
+DEFAULT_TOKEN = "mock-token"
+COURSE_ID = "101"
+ASSIGNMENT_ID = "202"
+
+FIRST_NAMES = ['Ada', 'Alan', 'Grace', 'Linus', 'Barbara', 'Ken', 'Margaret', 'Dennis', 'Frances', 'Edsger']
+LAST_NAMES = ['Lovelace', 'Turing', 'Hopper', 'Torvalds', 'Liskov', 'Thompson', 'Hamilton', 'Ritchie', 'Allen', 'Dijkstra']
+
+def make_roster(count):
+    """Students as Canvas users, some with middle names or hyphenated last names."""
+    users = []
+    for index in range(count):
+        first = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        suffix = index // (len(FIRST_NAMES) * len(LAST_NAMES))
+        if suffix:
+            last = f"{last}{suffix}"
+        if index % 7 == 3:
+            name = f"{first} Marie {last}"
+        elif index % 11 == 5:
+            name = f"{first} {last}-Smith"
+        else:
+            name = f"{first} {last}"
+        users.append({'id': 1000 + index, 'name': name, 'sortable_name': f"{name.split(' ')[-1]}, {' '.join(name.split(' ')[:-1])}"})
+    return users
+
+class MockCanvas:
+    def __init__(self, students=30, host="127.0.0.1", port=0, token=DEFAULT_TOKEN, job_delay=0.2, max_concurrent=None, latency=0.0):
+        self.users = make_roster(students)
+        self.token = token
+        self.job_delay = job_delay
+        self.max_concurrent = max_concurrent
+        self.latency = latency
+        self.grades = {}  # user id -> posted grade
+        self.comments = {}  # user id -> list of comments
+        self.progress = {}  # id -> (ready at, grade_data)
+        self.requests = []  # (method, path) of every request, for inspection
+        self.web_sessions = set()  # Cookies of logged-in SpeedGrader users
+        self.logins = 0
+        self.rejected = 0  # Requests refused by the rate limit
+        self.lock = threading.Lock()
+        self._in_flight = 0
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.canvas = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def speed_grader_url(self):
+        return f"{self.base_url}/courses/{COURSE_ID}/gradebook/speed_grader?assignment_id={ASSIGNMENT_ID}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _progress_json(self, progress_id):
+        # A job reports completed only once its grades have been applied
+        _, grade_data = self.progress[progress_id]
+        state = 'completed' if grade_data is None else 'running'
+        return {'id': progress_id, 'workflow_state': state, 'url': f"{self.base_url}/api/v1/progress/{progress_id}"}
+
+    def _finish_jobs(self):
+        # Apply bulk updates whose job time has passed
+        now = time.monotonic()
+        for progress_id, (ready_at, grade_data) in list(self.progress.items()):
+            if grade_data is not None and now >= ready_at:
+                for user_id, values in grade_data.items():
+                    if 'posted_grade' in values:
+                        self.grades[user_id] = values['posted_grade']
+                    if values.get('text_comment'):
+                        self.comments.setdefault(user_id, []).append(values['text_comment'])
+                self.progress[progress_id] = (ready_at, None)
+
+    def handle(self, method, path, query, form):
+        """Returns (status, JSON body, extra headers)."""
+        parts = path.strip('/').split('/')
+        with self.lock:
+            self._finish_jobs()
+            if parts[:4] == ['api', 'v1', 'courses', COURSE_ID] and parts[4:] == ['users'] and method == 'GET':
+                return self._page(self.users, path, query)
+            if parts[:6] == ['api', 'v1', 'courses', COURSE_ID, 'assignments', ASSIGNMENT_ID]:
+                if parts[6:] == ['submissions'] and method == 'GET':
+                    submissions = [{'user_id': user['id'], 'grade': self.grades.get(user['id']),
+                                    'workflow_state': 'graded' if user['id'] in self.grades else 'submitted'} for user in self.users]
+                    return self._page(submissions, path, query)
+                if parts[6:] == ['submissions', 'update_grades'] and method == 'POST':
+                    grade_data = {}
+                    for key, values in form.items():
+                        # grade_data[<user id>][<field>]
+                        if key.startswith('grade_data['):
+                            user_id, field = key[len('grade_data['):-1].split('][')
+                            grade_data.setdefault(int(user_id), {})[field] = values[0]
+                    known = {user['id'] for user in self.users}
+                    if not grade_data or not set(grade_data) <= known:
+                        return 400, {'errors': [{'message': 'unknown or missing students'}]}, {}
+                    progress_id = len(self.progress) + 1
+                    self.progress[progress_id] = (time.monotonic() + self.job_delay, grade_data)
+                    self._finish_jobs()
+                    return 200, self._progress_json(progress_id), {}
+            if parts[:3] == ['api', 'v1', 'progress'] and len(parts) == 4 and method == 'GET':
+                progress_id = int(parts[3])
+                if progress_id in self.progress:
+                    return 200, self._progress_json(progress_id), {}
+        return 404, {'errors': [{'message': 'The specified resource does not exist.'}]}, {}
+
+    def handle_web(self, method, path, query, form, session):
+        """SpeedGrader pages. Returns (status, HTML body, extra headers)."""
+        with self.lock:
+            self._finish_jobs()
+            if path == '/login/canvas' and method == 'POST':
+                if not form.get('pseudonym_session[unique_id]') or not form.get('pseudonym_session[password]'):
+                    return 200, LOGIN_PAGE.format(return_to=html.escape(form.get('return_to', ['/'])[0])), {}
+                session = secrets.token_hex(8)
+                self.web_sessions.add(session)
+                self.logins += 1
+                return 302, "", {'Location': form.get('return_to', ['/'])[0], 'Set-Cookie': f"canvas_session={session}; Path=/"}
+            if session not in self.web_sessions:
+                return_to = path + ('?' + '&'.join(f"{key}={quote(value)}" for key, values in query.items() for value in values) if query else '')
+                return 200, LOGIN_PAGE.format(return_to=html.escape(return_to)), {}
+            if path == f"/courses/{COURSE_ID}/gradebook/speed_grader" and method == 'GET':
+                return 200, self._speed_grader_page(query), {}
+            if path == '/speedgrader/submit' and method == 'POST':
+                user_id = int(form['student_id'][0])
+                self.grades[user_id] = form.get('grade', [''])[0]
+                comment = form.get('comment', [''])[0]
+                if comment:
+                    self.comments.setdefault(user_id, []).append(comment)
+                return 200, "ok", {}
+        return 404, "Page not found", {}
+
+    def _speed_grader_page(self, query):
+        student_ids = query.get('student_id')
+        user = next((user for user in self.users if student_ids and str(user['id']) == student_ids[0]), self.users[0])
+        options = "".join(
+            f'<option value="{other["id"]}" class="{"graded" if other["id"] in self.grades else "not_graded"}">{html.escape(other["name"])}</option>'
+            for other in self.users)
+        comments = "".join(f"<div class=\"comment\">{html.escape(comment)}</div>" for comment in self.comments.get(user['id'], []))
+        return SPEED_GRADER_PAGE.format(
+            options=options,
+            name=html.escape(user['name']),
+            user_id=user['id'],
+            grade=html.escape(str(self.grades.get(user['id']) or '')),
+            comments=comments,
+            editor=html.escape(EDITOR_DOCUMENT, quote=True),
+        )
+
+    def _page(self, items, path, query):
+        per_page = int(query.get('per_page', ['10'])[0])
+        page = int(query.get('page', ['1'])[0])
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(items):
+            next_query = '&'.join(f"{key}={value}" for key, values in query.items() if key != 'page' for value in values)
+            headers['Link'] = f'<{self.base_url}{path}?{next_query}&page={page + 1}>; rel="next"'
+        return 200, items[start:start + per_page], headers
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Log In to Canvas</title></head>
+<body>
+<form method="post" action="/login/canvas">
+  <input type="hidden" name="return_to" value="{return_to}">
+  <input id="pseudonym_session_unique_id" name="pseudonym_session[unique_id]">
+  <input id="pseudonym_session_password" name="pseudonym_session[password]" type="password">
+  <button class="Button--login" type="submit">Log In</button>
+</form>
+</body></html>"""
+
+# The comment box is a rich text editor in an iframe, as in Canvas
+EDITOR_DOCUMENT = '<html><body id="tinymce" contenteditable="true"></body></html>'
+
+SPEED_GRADER_PAGE = """<!DOCTYPE html>
+<html><head><title>SpeedGrader</title></head>
+<body>
+<select id="students_selectmenu" style="display: none">{options}</select>
+<div><span class="ui-selectmenu-item-header">{name}</span></div>
+<input id="grading-box-extended" value="{grade}">
+<iframe id="comment_rce_textarea_ifr" srcdoc="{editor}"></iframe>
+<button id="comment_submit_button" type="button">Submit</button>
+<div id="comments">{comments}</div>
+<script>
+document.getElementById('comment_submit_button').addEventListener('click', function () {{
+  var editor = document.getElementById('comment_rce_textarea_ifr').contentDocument.body;
+  var comment = editor.innerText.trim();
+  var body = new URLSearchParams({{
+    student_id: '{user_id}',
+    grade: document.getElementById('grading-box-extended').value,
+    comment: comment
+  }});
+  fetch('/speedgrader/submit', {{method: 'POST', body: body}}).then(function () {{
+    var entry = document.createElement('div');
+    entry.className = 'comment';
+    entry.textContent = comment;
+    document.getElementById('comments').appendChild(entry);
+    editor.innerHTML = '';
+  }});
+}});
+</script>
+</body></html>"""
+
+class _Handler(BaseHTTPRequestHandler):
+    def _serve(self, method):
+        canvas = self.server.canvas
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8')) if length else {}
+
+        if not parsed.path.startswith('/api/'):
+            time.sleep(canvas.latency)
+            with canvas.lock:
+                canvas.requests.append((method, parsed.path))
+            cookie = SimpleCookie(self.headers.get('Cookie', ''))
+            session = cookie['canvas_session'].value if 'canvas_session' in cookie else None
+            status, body, headers = canvas.handle_web(method, parsed.path, parse_qs(parsed.query), form, session)
+            self._send(status, body.encode('utf-8'), headers, 'text/html; charset=utf-8')
+            return
+
+        with canvas.lock:
+            canvas.requests.append((method, parsed.path))
+            throttled = canvas.max_concurrent is not None and canvas._in_flight >= canvas.max_concurrent
+            if throttled:
+                canvas.rejected += 1
+            else:
+                canvas._in_flight += 1
+        try:
+            # Latency counts towards the requests in flight, as server time would
+            time.sleep(canvas.latency)
+            if throttled:
+                self._send(403, b"403 Forbidden (Rate Limit Exceeded)", {}, 'text/plain')
+            elif self.headers.get('Authorization') != f"Bearer {canvas.token}":
+                self._send(401, json.dumps({'errors': [{'message': 'Invalid access token.'}]}).encode('utf-8'), {})
+            else:
+                status, body, headers = canvas.handle(method, parsed.path, parse_qs(parsed.query), form)
+                self._send(status, json.dumps(body).encode('utf-8'), headers)
+        finally:
+            if not throttled:
+                with canvas.lock:
+                    canvas._in_flight -= 1
+
+    def _send(self, status, body, headers, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._serve('GET')
+
+    def do_POST(self):
+        self._serve('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Canvas server for trying out grade uploads.")
+    parser.add_argument('--students', type=int, default=30)
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--token', default=DEFAULT_TOKEN)
+    args = parser.parse_args()
+
+    with MockCanvas(args.students, port=args.port, token=args.token) as canvas:
+        print(f"SpeedGrader URL: {canvas.speed_grader_url}")
+        print(f"API token: {canvas.token} (SpeedGrader accepts any username and password)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,62 @@
 # Import necessary libraries for extraction, fetching, and grading HTML
-import os
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
+from utilities import as_page
+from site_crawler import SiteCrawler
+import link_checker
 
-def strip_trailing_slash(url):
-    """Remove trailing slash from a URL for comparison."""
-    return url.rstrip('/')
+# Bump when the rubric changes so stored results are regraded
+GRADER_VERSION = "1.1"
 
-def grade_my_first_website(url, student_name, assignment_name):
+# The score also depends on the linked pages and external links, which the run
+# manifest doesn't hash, so stored results are never reused
+INCREMENTAL = False
+
+# Only the submitted page and the pages it links to directly are graded
+MAX_PAGES = 20
+MAX_DEPTH = 1
+
+def grade_my_first_website(page, student_name, assignment_name):
     feedback = []
     total_score = 0  # Starting from zero, will add points based on rubric
 
     try:
-        # Strip trailing slash from the submitted URL for comparison
-        url_for_comparison = strip_trailing_slash(url)
+        # Use the prefetched submitted page, or fetch it if we were handed a URL
+        page = as_page(page)
+        url = page.url
 
-        # Fetch the submitted page's HTML with SSL verification disabled
-        response = requests.get(url, verify=False)
-        response.raise_for_status()
-        content = response.text
-        soup = BeautifulSoup(content, 'html.parser')
-
-        # Store pages to analyze: start with the submitted page
-        pages = [(url, soup)]  # List of (url, soup) tuples
+        doc = page.parse()
         base_url = urlparse(url).netloc  # Get the domain of the submitted URL
-        internal_links = []
-
-        # Find all internal links on the submitted page
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            parsed_href = urlparse(href)
-
-            # Check if the link is internal (same domain or relative path)
-            if not parsed_href.netloc or parsed_href.netloc == base_url:
-                # Resolve relative URLs to absolute for fetching
-                absolute_url = urljoin(url, href)
-                # Avoid adding the same page (self-referential link)
-                if strip_trailing_slash(absolute_url) != url_for_comparison:
-                    internal_links.append((a_tag, absolute_url))
-
-        # Fetch all linked pages to check for bi-directional linking
-        linked_pages = []  # List of (url, soup, a_tag) tuples for linked pages
-        for a_tag, linked_url in internal_links:
-            try:
-                linked_response = requests.get(linked_url, verify=False)
-                linked_response.raise_for_status()
-                linked_page_soup = BeautifulSoup(linked_response.text, 'html.parser')
-                linked_pages.append((linked_url, linked_page_soup, a_tag))
-                pages.append((linked_url, linked_page_soup))  # Add to pages for external link check
-            except requests.exceptions.RequestException as e:
-                feedback.append(f"Could not access linked page {linked_url}: {e}")
+
+        # Fetch every unique page the submitted page links to (once each, concurrently)
+        # and build the internal link graph between them
+        site = SiteCrawler(url, doc, max_pages=MAX_PAGES, max_depth=MAX_DEPTH).crawl()
+        start = site.start
+        for linked_url, error in site.failed.values():
+            feedback.append(f"Could not access linked page {linked_url}: {error}")
+
+        # Store pages to analyze: the submitted page followed by the linked pages
+        pages = [(page_url, page_doc) for page_url, page_doc in site.pages.values()]  # List of (url, ParsedPage) tuples
+        internal_links = site.links_from(start)
+        linked_pages = [target for target in internal_links if target in site.pages]
 
         # 1. Internal Links (13 points)
         internal_links_score = 0
 
         if internal_links and linked_pages:
-            # Check if the submitted page has at least one valid internal link that opens in the same tab
-            submitted_to_linked = False
-            for linked_url, linked_soup, a_tag in linked_pages:
-                # Check if the link opens in the same tab (no target="_blank")
-                if a_tag.get('target') == '_blank':
-                    feedback.append("Internal link on submitted page opens in a new tab, should open in the same tab.")
-                    internal_links_score = 7
-                    break
-                submitted_to_linked = True
-                break  # We only need one valid link to a linked page
+            # Check if the submitted page links to a linked page in the same tab (no target="_blank")
+            submitted_to_linked = any(target in site.same_tab_links[start] for target in linked_pages)
+            if not submitted_to_linked:
+                feedback.append("Internal link on submitted page opens in a new tab, should open in the same tab.")
+                internal_links_score = 7
 
             # Check if any linked page links back to the submitted page
             linked_to_submitted = False
             if submitted_to_linked:
-                for linked_url, linked_soup, _ in linked_pages:
-                    for a_tag in linked_soup.find_all('a', href=True):
-                        href = a_tag['href']
-                        parsed_href = urlparse(href)
-                        if not parsed_href.netloc or parsed_href.netloc == base_url:
-                            absolute_back_url = urljoin(linked_url, href)
-                            # Strip trailing slashes for comparison
-                            if strip_trailing_slash(absolute_back_url) == url_for_comparison:
-                                # Check if the back link opens in the same tab
-                                if a_tag.get('target') == '_blank':
-                                    feedback.append("Internal link on linked page opens in a new tab, should open in the same tab.")
-                                    internal_links_score = 7
-                                    break
-                                else:
-                                    linked_to_submitted = True
-                                    break
-                    if linked_to_submitted:
-                        break  # Found a page that links back, no need to check more
+                linked_to_submitted = any(start in site.same_tab_links.get(target, ()) for target in linked_pages)
+                if not linked_to_submitted and any(start in site.new_tab_links.get(target, ()) for target in linked_pages):
+                    feedback.append("Internal link on linked page opens in a new tab, should open in the same tab.")
+                    internal_links_score = 7
 
             # Award points based on bi-directional linking
             if submitted_to_linked and linked_to_submitted:
@@ -111,8 +80,8 @@ def grade_my_first_website(url, student_name, assignment_name):
         external_link_found = False
 
         # Check all pages for an external link
-        for page_url, page_soup in pages:
-            for a_tag in page_soup.find_all('a', href=True):
+        for page_url, page_doc in pages:
+            for a_tag in page_doc.find_all('a', href=True):
                 href = a_tag['href']
                 parsed_href = urlparse(href)
 
@@ -124,13 +93,11 @@ def grade_my_first_website(url, student_name, assignment_name):
 
                     if opens_in_new_tab:
                         # Verify the link is an absolute path (already confirmed by urlparse having a scheme)
-                        try:
-                            # Optionally fetch the link to ensure it's accessible
-                            external_response = requests.get(href, verify=False)
-                            external_response.raise_for_status()
+                        # and that it is reachable (shared, cached HEAD-first probe)
+                        if link_checker.is_reachable(href):
                             external_link_score = 7
                             # No feedback since full points are awarded
-                        except requests.exceptions.RequestException:
+                        else:
                             external_link_score = 3
                             feedback.append(f"External link on {page_url} is not accessible, but uses an absolute path and opens in a new tab.")
                     else:
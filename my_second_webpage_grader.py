@@ -1,110 +1,82 @@
-import os
 import requests
-from bs4 import BeautifulSoup
-
-from utilities import fetch_html, save_to_file
-
-def grade_my_second_webpage(url, student_name, assignment_name):
-    feedback = []
-    total_score = 40  # Starting from full score
-
-    try:
-        # Fetch the website HTML with SSL verification disabled
-        response = requests.get(url, verify=False)
-        response.raise_for_status()
-        content = response.text
-
-        soup = BeautifulSoup(content, 'html.parser')
-
+from utilities import as_page
+from rubric import Rubric, Section, Rule
+
+# Bump when the rubric changes so stored results are regraded
+GRADER_VERSION = "1.0"
+
+def style_of(tag):
+    return tag.get('style', '').lower() if tag else ""
+
+def valid_image_count(f):
+    return sum(1 for img in f.doc.find_all('img') if img.get('alt'))
+
+def border_image_missing(f):
+    return not any("border" in (img.get('src') or "").lower() for img in f.doc.find_all('img'))
+
+def youtube_logo_missing(f):
+    return not any("youtube" in (img.get('src') or "").lower() and img.get('width') == "80px" for img in f.doc.find_all('img'))
+
+def list_styles_missing(f):
+    return not any([style_of(f.doc.find('ul')), style_of(f.doc.find('ol'))])
+
+def border_styles_count(f):
+    return sum(1 for tag in f.doc.find_all(style=True) if "border" in style_of(tag))
+
+RUBRIC = Rubric(
+    name="my second webpage",
+    total=40,  # Starting from full score
+    facts={
+        'valid_image_count': valid_image_count,
+        'too_few_alt_images': lambda f: f['valid_image_count'] < 3,
+        'border_image_missing': border_image_missing,
+        'youtube_logo_missing': youtube_logo_missing,
+        'body_background_missing': lambda f: "background-color" not in style_of(f.doc.body),
+        # Counts the headings, not the headings that actually have a style
+        'heading_styles_missing': lambda f: f['count:h1,h2,h3'] < 3,
+        'list_styles_missing': list_styles_missing,
+        'border_styles_missing': lambda f: border_styles_count(f) < 2,
+        'few_smaller_headings': lambda f: f['count:h2,h3'] < 2,
+    },
+    sections=[
         # 1. File structure (4 pts)
-        missing_tags = []
-        doctype_present = '<!DOCTYPE' in content.upper()
-        html_tag = soup.find('html')
-        head_tag = soup.find('head')
-        body_tag = soup.find('body')
-
-        if not doctype_present:
-            missing_tags.append("<!DOCTYPE>")
-        if not html_tag:
-            missing_tags.append("<html>")
-        if not head_tag:
-            missing_tags.append("<head>")
-        if not body_tag:
-            missing_tags.append("<body>")
-
-        if missing_tags:
-            feedback.append(f"Missing structure elements: {', '.join(missing_tags)}.")
-            total_score -= 4
-
-        # 2. HTML content (12 pts)
-        html_content_issues = []
-        h1_tag = soup.find('h1')
-        hr_tag = soup.find('hr')
-        p_tag = soup.find('p')
-        smaller_headings = soup.find_all(['h2', 'h3'])
-        ul_tag = soup.find('ul')
-        ol_tag = soup.find('ol')
-
-        if not h1_tag:
-            html_content_issues.append("Missing largest heading (<h1>).")
-        if not hr_tag:
-            html_content_issues.append("Missing horizontal rule (<hr>).")
-        if not p_tag:
-            html_content_issues.append("Missing paragraph (<p>).")
-        if len(smaller_headings) < 2:
-            html_content_issues.append("Fewer than 2 smaller headings (<h2> or <h3>).")
-        if not ul_tag:
-            html_content_issues.append("Missing unordered list (<ul>).")
-        if not ol_tag:
-            html_content_issues.append("Missing ordered list (<ol>).")
-
-        if html_content_issues:
-            feedback.append(f"HTML content issues: {', '.join(html_content_issues)}.")
-            total_score -= min(6, len(html_content_issues) * 2)  # Deduct 2 points per issue, capped at 6.
-
-        # 3. Images (12 pts)
-        img_tags = soup.find_all('img')
-        valid_images = [img for img in img_tags if img.get('alt')]
-        border_image = any("border" in (img.get('src') or "").lower() for img in img_tags)
-        youtube_logo = any("youtube" in (img.get('src') or "").lower() and img.get('width') == "80px" for img in img_tags)
-
-        if len(valid_images) < 3:
-            feedback.append(f"Missing alt attributes or fewer than 3 images have alt attributes. Found: {len(valid_images)}.")
-            total_score -= 4
-        if not border_image:
-            feedback.append("Missing border image.")
-            total_score -= 2
-        if not youtube_logo:
-            feedback.append("Missing YouTube logo with correct size (80px width).")
-            total_score -= 2
-
-        # 4. Inline styles (12 pts)
-        style_issues = []
-        body_style = soup.body.get('style', '').lower() if soup.body else ""
-        has_background_color = "background-color" in body_style
-        heading_styles = [tag.get('style', '').lower() for tag in soup.find_all(['h1', 'h2', 'h3'])]
-        list_styles = [ul_tag.get('style', '').lower() if ul_tag else "", ol_tag.get('style', '').lower() if ol_tag else ""]
-        border_styles = [tag.get('style', '').lower() for tag in soup.find_all(True) if "border" in (tag.get('style', '').lower())]
-
-        if not has_background_color:
-            style_issues.append("Missing background color style on <body>.")
-        if len(heading_styles) < 3:
-            style_issues.append("Fewer than 3 headings (<h1>, <h2>, <h3>) have inline styles.")
-        if not any(list_styles):
-            style_issues.append("Lists (<ul> or <ol>) are missing styles.")
-        if len(border_styles) < 2:
-            style_issues.append("Fewer than 2 elements use border property.")
-
-        if style_issues:
-            feedback.append(f"Inline style issues: {', '.join(style_issues)}.")
-            total_score -= min(6, len(style_issues) * 2)  # Deduct 2 points per issue, capped at 6.
-
+        Section([
+            Rule(lambda f: not f['doctype'], 4, "<!DOCTYPE>"),
+            Rule(lambda f: not f['html'], 4, "<html>"),
+            Rule(lambda f: not f['head'], 4, "<head>"),
+            Rule(lambda f: not f['body'], 4, "<body>"),
+        ], cap=4, feedback="Missing structure elements: {}."),
+        # 2. HTML content: 2 pts per issue, capped at 6
+        Section([
+            Rule('missing:h1', 2, "Missing largest heading (<h1>)."),
+            Rule('missing:hr', 2, "Missing horizontal rule (<hr>)."),
+            Rule('missing:p', 2, "Missing paragraph (<p>)."),
+            Rule('few_smaller_headings', 2, "Fewer than 2 smaller headings (<h2> or <h3>)."),
+            Rule('missing:ul', 2, "Missing unordered list (<ul>)."),
+            Rule('missing:ol', 2, "Missing ordered list (<ol>)."),
+        ], cap=6, feedback="HTML content issues: {}."),
+        # 3. Images
+        Section([
+            Rule('too_few_alt_images', 4, "Missing alt attributes or fewer than 3 images have alt attributes. Found: {valid_image_count}."),
+            Rule('border_image_missing', 2, "Missing border image."),
+            Rule('youtube_logo_missing', 2, "Missing YouTube logo with correct size (80px width)."),
+        ]),
+        # 4. Inline styles: 2 pts per issue, capped at 6
+        Section([
+            Rule('body_background_missing', 2, "Missing background color style on <body>."),
+            Rule('heading_styles_missing', 2, "Fewer than 3 headings (<h1>, <h2>, <h3>) have inline styles."),
+            Rule('list_styles_missing', 2, "Lists (<ul> or <ol>) are missing styles."),
+            Rule('border_styles_missing', 2, "Fewer than 2 elements use border property."),
+        ], cap=6, feedback="Inline style issues: {}."),
+    ],
+)
+
+def grade_my_second_webpage(page, student_name, assignment_name):
+    try:
+        # Use the prefetched page, or fetch it if we were handed a URL
+        page = as_page(page)
     except requests.exceptions.RequestException as e:
-        feedback.append(f"Failed to fetch website: {e}")
-        total_score = 0  # No score if the website can't be fetched
-
-    # Ensure total score doesn't go below zero
-    total_score = max(total_score, 0)
+        return 0, [f"Failed to fetch website: {e}"]  # No score if the website can't be fetched
 
-    # Return the score and feedback
-    return total_score, feedback
\ No newline at end of file
+    # Parse once; the rubric queries the shared element index
+    return RUBRIC.evaluate(page.parse())
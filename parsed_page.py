@@ -0,0 +1,138 @@
+# Parse-once page wrapper shared by the rubric checks
+#
+# BeautifulSoup's find/find_all walk the whole tree on every call. ParsedPage
+# walks it once and indexes every element by tag name, by attribute name and
+# by document order, so graders can run as many queries as they like without
+# re-walking the tree. Queries return the same bs4 Tag objects (in the same
+# order) that soup.find/find_all would.
+import re
+from bisect import bisect_right
+from bs4 import Tag
+from html_parsers import get_parser, resolve_parser, make_soup
+
+# lxml and html5lib invent <html>, <head> and <body> when a page leaves them
+# out. Rubrics check for these, so they are only indexed if the source has them.
+SKELETON_TAGS = ('html', 'head', 'body')
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+_SKELETON_PATTERN = re.compile(r'<\s*(html|head|body)[\s/>]', re.IGNORECASE)
+
+class ParsedPage:
+    def __init__(self, content, soup=None, parser=None):
+        self.content = content
+        self.parser = resolve_parser(parser) if parser else get_parser()
+        self.soup = soup if soup is not None else make_soup(content, self.parser)
+        self.elements = []  # Every tag, in document order
+        self._position = {}  # id(tag) -> index into self.elements
+        self._end = []  # Index of the last descendant of each element
+        self._by_tag = {}  # Tag name -> element indexes
+        self._by_attr = {}  # Attribute name -> element indexes
+        self._preceding = {}  # Tag names -> nearest preceding match for each element index
+        self._build_index()
+
+    def _build_index(self):
+        skipped_tags = ()
+        if self.parser != 'html.parser':
+            declared = {name.lower() for name in _SKELETON_PATTERN.findall(self.content)}
+            skipped_tags = tuple(name for name in SKELETON_TAGS if name not in declared)
+
+        open_elements = []  # Ancestors of the current element
+        for element in self.soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+            index = len(self.elements)
+            # Close every open element that isn't this element's parent
+            while open_elements and open_elements[-1] is not element.parent:
+                self._end[self._position[id(open_elements.pop())]] = index - 1
+            open_elements.append(element)
+
+            self.elements.append(element)
+            self._end.append(index)
+            self._position[id(element)] = index
+            if element.name in skipped_tags:
+                continue
+            self._by_tag.setdefault(element.name, []).append(index)
+            for attr in element.attrs:
+                self._by_attr.setdefault(attr, []).append(index)
+        for element in open_elements:
+            self._end[self._position[id(element)]] = len(self.elements) - 1
+
+    def position(self, element):
+        """Document-order index of an element."""
+        return self._position[id(element)]
+
+    def previous(self, element):
+        """The element directly before this one in document order, or None."""
+        index = self.position(element)
+        return self.elements[index - 1] if index > 0 else None
+
+    def _nearest_preceding(self, names):
+        # Built in one pass the first time a set of names is asked about
+        key = tuple(names)
+        nearest = self._preceding.get(key)
+        if nearest is None:
+            matches = {index for name in key for index in self._by_tag.get(name, [])}
+            nearest = []
+            last = None
+            for index in range(len(self.elements)):
+                nearest.append(last)
+                if index in matches:
+                    last = index
+            self._preceding[key] = nearest
+        return nearest
+
+    def preceding(self, element, names):
+        """
+        The nearest element before this one (in document order) whose tag is
+        one of `names`, or None. Ancestors count, as they open first.
+        """
+        index = self._nearest_preceding([names] if isinstance(names, str) else names)[self.position(element)]
+        return self.elements[index] if index is not None else None
+
+    def _candidates(self, name, attrs):
+        if name is None or name is True:
+            indexes = range(len(self.elements))
+        elif isinstance(name, str):
+            indexes = self._by_tag.get(name, [])
+        else:
+            indexes = sorted(index for tag in name for index in self._by_tag.get(tag, []))
+        # Narrow by the rarest required attribute first
+        for attr in sorted(attrs, key=lambda attr: len(self._by_attr.get(attr, []))):
+            present = set(self._by_attr.get(attr, []))
+            indexes = [index for index in indexes if index in present]
+        return indexes
+
+    def _query(self, name, within, attrs):
+        for attr, wanted in attrs.items():
+            if wanted is not True:
+                raise ValueError(f"Only attribute presence (e.g. {attr}=True) can be queried")
+        indexes = self._candidates(name, attrs)
+        if within is not None:
+            start = self.position(within)
+            indexes = list(indexes)
+            indexes = indexes[bisect_right(indexes, start):bisect_right(indexes, self._end[start])]
+        return indexes
+
+    def find_all(self, name=None, within=None, **attrs):
+        """
+        Elements with the given tag name(s), in document order.
+
+        `name` may be a tag name, a list of names, or True for every element.
+        `within` limits the search to an element's descendants, and keyword
+        arguments such as href=True require an attribute to be present.
+        """
+        return [self.elements[index] for index in self._query(name, within, attrs)]
+
+    def find(self, name=None, within=None, **attrs):
+        indexes = self._query(name, within, attrs)
+        return self.elements[indexes[0]] if indexes else None
+
+    def count(self, name=None, within=None, **attrs):
+        return len(self._query(name, within, attrs))
+
+    @property
+    def body(self):
+        return self.find('body')
+
+    @property
+    def head(self):
+        return self.find('head')
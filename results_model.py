@@ -0,0 +1,119 @@
+# Results table model for the GUI
+#
+# Keeps graded rows in flat per-column lists, with each distinct feedback
+# string stored once (most students share a handful of messages), and keeps
+# the filtered, sorted view as a list of row numbers. The GUI only builds
+# Treeview items for the rows on screen, so filtering and sorting thousands of
+# students never touches the widget.
+COLUMNS = ('Student', 'Score', 'Late', 'Feedback')
+
+def _score_key(score):
+    try:
+        return (0, float(score))
+    except (TypeError, ValueError):
+        return (1, 0.0)  # Missing or odd scores sort together after the numbers
+
+class ResultsModel:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._students = []
+        self._scores = []
+        self._late = bytearray()
+        self._feedback = []  # Index into _messages
+        self._messages = []
+        self._message_ids = {}
+        self._messages_lower = []
+        self._view = []
+        self._filter = {}
+        self._matching = None  # Message ids containing the filter text, if any
+        self._sort = None  # (column, reverse)
+        self._sorted = True
+
+    @property
+    def total(self):
+        """Rows stored, before filtering."""
+        return len(self._students)
+
+    @property
+    def sort_order(self):
+        return self._sort
+
+    def append(self, student, score, feedback, late=False):
+        message_id = self._message_ids.get(feedback)
+        if message_id is None:
+            message_id = self._message_ids[feedback] = len(self._messages)
+            self._messages.append(feedback)
+            self._messages_lower.append(str(feedback).lower())
+            if self._matching is not None and self._filter['text'] in self._messages_lower[message_id]:
+                self._matching.add(message_id)
+        row = len(self._students)
+        self._students.append(student)
+        self._scores.append(score)
+        self._late.append(1 if late else 0)
+        self._feedback.append(message_id)
+        if self._matches(row):
+            self._view.append(row)
+            self._sorted = self._sort is None
+        return row
+
+    def row(self, row):
+        """(student, score, late, feedback) for a stored row number."""
+        return self._students[row], self._scores[row], bool(self._late[row]), self._messages[self._feedback[row]]
+
+    def __len__(self):
+        return len(self._view)
+
+    def rows(self, start, stop):
+        """[(row number, values)] for the visible rows start..stop of the view."""
+        if not self._sorted:
+            self._apply_sort()
+        return [(row, self.row(row)) for row in self._view[start:stop]]
+
+    def set_filter(self, min_score=None, max_score=None, late=None, text=None):
+        """Show only rows in the score range, with the given late flag and whose feedback contains text."""
+        text = (text or '').lower()
+        self._filter = {'min_score': min_score, 'max_score': max_score, 'late': late, 'text': text}
+        # Substring search runs over the distinct messages, not every row
+        self._matching = {message_id for message_id, message in enumerate(self._messages_lower) if text in message} if text else None
+        self._view = [row for row in range(len(self._students)) if self._matches(row)]
+        self._sorted = self._sort is None
+
+    def sort(self, column, reverse=False):
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        self._sort = (column, reverse)
+        self._apply_sort()
+
+    def _apply_sort(self):
+        column, reverse = self._sort
+        if column == 'Student':
+            keys = [str(student).lower() for student in self._students]
+        elif column == 'Score':
+            keys = [_score_key(score) for score in self._scores]
+        elif column == 'Late':
+            keys = self._late
+        else:
+            keys = [self._messages_lower[message_id] for message_id in self._feedback]
+        self._view.sort(key=keys.__getitem__, reverse=reverse)
+        self._sorted = True
+
+    def _matches(self, row):
+        if not self._filter:
+            return True
+        late = self._filter['late']
+        if late is not None and bool(self._late[row]) != late:
+            return False
+        if self._matching is not None and self._feedback[row] not in self._matching:
+            return False
+        min_score, max_score = self._filter['min_score'], self._filter['max_score']
+        if min_score is not None or max_score is not None:
+            score = _score_key(self._scores[row])
+            if score[0]:
+                return False
+            if min_score is not None and score[1] < min_score:
+                return False
+            if max_score is not None and score[1] > max_score:
+                return False
+        return True
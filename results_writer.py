@@ -0,0 +1,105 @@
+# Streaming grading results
+#
+# Each student's row is appended to a partial CSV (and optionally a JSONL
+# file) and flushed as soon as the student is graded, so a crash part way
+# through a class keeps every result written so far. When the run finishes
+# the partial CSV is sorted by student into the final results CSV. A partial
+# CSV left behind by a crashed run is finalized when the next run starts, so
+# its rows aren't overwritten.
+import csv
+import json
+import os
+import threading
+
+RESULTS_NAME = 'grading_results'
+PARTIAL_SUFFIX = '.partial.csv'
+
+# Header of the student column (blank, like the files pandas used to write)
+STUDENT_COLUMN = ''
+
+class ResultsWriter:
+    """
+    Append-only results sink: write(student, row) per student, then close().
+
+    Columns are taken from the first row unless fieldnames is given. Safe to
+    call from several grading threads at once.
+    """
+    def __init__(self, directory, name=RESULTS_NAME, fieldnames=None, jsonl=False):
+        os.makedirs(directory, exist_ok=True)
+        self.csv_path = os.path.join(directory, name + '.csv')
+        self.partial_path = os.path.join(directory, name + PARTIAL_SUFFIX)
+        self.jsonl_path = os.path.join(directory, name + '.jsonl') if jsonl else None
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.rows = 0
+        self._lock = threading.Lock()
+        if recover(self.partial_path, self.csv_path):
+            print(f"Recovered the results of an interrupted run into {self.csv_path}")
+        self._csv_file = open(self.partial_path, 'w', newline='', encoding='utf-8')
+        self._csv_writer = None
+        self._jsonl_file = open(self.jsonl_path, 'w', encoding='utf-8') if jsonl else None
+
+    def write(self, student, row):
+        with self._lock:
+            if self._csv_writer is None:
+                if self.fieldnames is None:
+                    self.fieldnames = list(row)
+                self._csv_writer = csv.writer(self._csv_file, lineterminator=os.linesep)
+                self._csv_writer.writerow([STUDENT_COLUMN] + self.fieldnames)
+            self._csv_writer.writerow([student] + [row.get(field, '') for field in self.fieldnames])
+            self._csv_file.flush()
+            if self._jsonl_file is not None:
+                self._jsonl_file.write(json.dumps(dict(Student=student, **row)) + '\n')
+                self._jsonl_file.flush()
+            self.rows += 1
+
+    def close(self):
+        """Finish the run: write the sorted results CSV and drop the partial file."""
+        self._close_files()
+        finalize(self.partial_path, self.csv_path)
+        return self.csv_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # After a crash the partial file is left alone for finalize() to recover
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_files()
+
+    def _close_files(self):
+        with self._lock:
+            self._csv_file.close()
+            if self._jsonl_file is not None:
+                self._jsonl_file.close()
+
+def finalize(partial_path, csv_path):
+    """Sort a partial results CSV by student into csv_path."""
+    with open(partial_path, 'r', newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    header, body = (rows[0], rows[1:]) if rows else ([STUDENT_COLUMN], [])
+    body.sort(key=lambda row: row[0])
+    temp_path = csv_path + '.tmp'
+    with open(temp_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator=os.linesep)
+        writer.writerow(header)
+        writer.writerows(body)
+    os.replace(temp_path, csv_path)
+    os.remove(partial_path)
+
+def recover(partial_path, csv_path):
+    """Finalize a partial CSV left by a crashed run. Returns True if it had any rows."""
+    try:
+        with open(partial_path, 'r', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            next(reader, None)  # Header
+            has_rows = next(reader, None) is not None
+    except FileNotFoundError:
+        return False
+    if not has_rows:
+        # Nothing was graded before the crash; keep the last good results CSV
+        os.remove(partial_path)
+        return False
+    finalize(partial_path, csv_path)
+    return True
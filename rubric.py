@@ -0,0 +1,118 @@
+# Declarative rubrics
+#
+# A rubric is plain Python data: sections of rules, where each rule names the
+# fact that means the check failed, how many points that costs and the feedback
+# to give. Facts are small functions over a ParsedPage. The page is indexed in
+# a single traversal when it is parsed, and each fact is computed at most once
+# per page from that index, however many rules use it, so adding an assignment
+# means adding a rubric definition rather than another set of tree walks.
+#
+# Scoring: every section deducts the points of its failed rules, capped at the
+# section's `cap` if it has one, and the score is total minus all deductions
+# (never below zero). A section with a `feedback` template reports its failed
+# rules as one combined message, e.g. "HTML content issues: a, b.".
+
+import tracing
+
+class Rule:
+    """
+    One rubric check.
+
+    `when` is the name of a fact (or a callable taking the facts) that is true
+    when the check FAILS. `feedback` may use {fact_name} placeholders.
+    """
+    def __init__(self, when, points, feedback):
+        self.when = when
+        self.points = points
+        self.feedback = feedback
+
+    def failed(self, facts):
+        return bool(self.when(facts) if callable(self.when) else facts[self.when])
+
+class Section:
+    def __init__(self, rules, cap=None, feedback=None):
+        self.rules = rules
+        self.cap = cap
+        self.feedback = feedback
+
+class Rubric:
+    def __init__(self, name, total, sections, facts=None):
+        self.name = name
+        self.total = total
+        self.sections = sections
+        self.facts = dict(facts or {})
+        self.validate()
+
+    def validate(self):
+        """Check that every fact named by a rule exists, so typos fail at import time."""
+        for section in self.sections:
+            for rule in section.rules:
+                if not callable(rule.when) and not self._has_fact(rule.when):
+                    raise ValueError(f"Rubric '{self.name}' uses unknown fact '{rule.when}'")
+
+    def _has_fact(self, name):
+        if name in self.facts or name in FACTS:
+            return True
+        prefix, _, _ = name.partition(':')
+        return prefix in PARAMETERIZED_FACTS
+
+    def evaluate(self, doc):
+        """Score a ParsedPage. Returns (score, feedback list)."""
+        with tracing.span('rubric', rubric=self.name):
+            facts = Facts(self, doc)
+            feedback = []
+            score = self.total
+            for section in self.sections:
+                failed = [rule for rule in section.rules if rule.failed(facts)]
+                if not failed:
+                    continue
+                deduction = sum(rule.points for rule in failed)
+                if section.cap is not None:
+                    deduction = min(deduction, section.cap)
+                score -= deduction
+                messages = [rule.feedback.format_map(facts) for rule in failed]
+                if section.feedback:
+                    feedback.append(section.feedback.format(', '.join(messages)))
+                else:
+                    feedback.extend(messages)
+            return max(score, 0), feedback
+
+class Facts(dict):
+    """Facts about one page, computed on first use and then remembered."""
+    def __init__(self, rubric, doc):
+        super().__init__()
+        self.rubric = rubric
+        self.doc = doc
+        self.content = doc.content
+
+    def __missing__(self, name):
+        if name in self.rubric.facts:
+            value = self.rubric.facts[name](self)
+        elif name in FACTS:
+            value = FACTS[name](self)
+        else:
+            prefix, _, argument = name.partition(':')
+            if prefix not in PARAMETERIZED_FACTS:
+                raise KeyError(name)
+            value = PARAMETERIZED_FACTS[prefix](self, argument)
+        self[name] = value
+        return value
+
+# Facts shared by every rubric
+FACTS = {
+    'doctype': lambda f: '<!DOCTYPE' in f.content.upper(),
+    'html': lambda f: f.doc.find('html') is not None,
+    'head': lambda f: f.doc.find('head') is not None,
+    'body': lambda f: f.doc.find('body') is not None,
+    'basic_structure_count': lambda f: sum([f['doctype'], f['html'], f['head'], f['body']]),
+    'missing_basic_structure': lambda f: f['basic_structure_count'] < 4,
+    'indented': lambda f: any(len(line) - len(line.lstrip()) > 0 for line in f.content.split('\n') if line.strip()),
+    'missing_indentation': lambda f: f['basic_structure_count'] == 4 and not f['indented'],
+}
+
+# Facts written as "kind:tags", e.g. "missing:h1" or "count:h2,h3"
+PARAMETERIZED_FACTS = {
+    'has': lambda f, tags: f.doc.find(tags.split(',')) is not None,
+    'missing': lambda f, tags: f.doc.find(tags.split(',')) is None,
+    'count': lambda f, tags: f.doc.count(tags.split(',')),
+}
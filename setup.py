@@ -12,7 +12,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         'beautifulsoup4',
-        'pandas',
+        'lxml',
         'selenium',
         'pygetwindow',
         'requests',
@@ -26,6 +26,7 @@ setup(
     python_requires='>=3.7',
     entry_points={
         'console_scripts': [
+            'grade-batch=batch:main',
             'grade-heading=heading_hr_grader:main',
             'grade-myfirst=my_first_webpage_grader:main',
             'grade-mysecond=my_second_webpage_grader:main',
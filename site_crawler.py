@@ -0,0 +1,120 @@
+# Small crawler for multi-page student sites
+#
+# Starting from the submitted page, the crawler follows internal links
+# breadth-first, fetching each unique page once (concurrently) up to a page cap
+# and a depth cap. It returns a SiteGraph: the parsed pages plus adjacency sets
+# of internal links, split by whether the link opens in the same tab or a new
+# one, so rubric checks like "do the pages link to each other" are set lookups.
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
+import http_client
+import tracing
+from parsed_page import ParsedPage
+
+DEFAULT_MAX_PAGES = 20
+DEFAULT_MAX_DEPTH = 1
+DEFAULT_WORKERS = 4
+
+INDEX_PAGES = ('index.html', 'index.htm')
+
+def normalize_url(url):
+    """Normalize a page URL so links to the same page compare equal.
+
+    Drops the fragment, a trailing index.html and trailing slashes, and
+    lowercases the scheme and host.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path
+    directory, _, last = path.rpartition('/')
+    if last.lower() in INDEX_PAGES:
+        path = directory
+    path = path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+class SiteGraph:
+    def __init__(self, start):
+        self.start = start  # Normalized URL of the submitted page
+        self.pages = {}  # Normalized URL -> (URL as linked, ParsedPage), in discovery order
+        self.same_tab_links = {}  # Normalized URL -> set of internal pages it links to in the same tab
+        self.new_tab_links = {}  # Normalized URL -> set of internal pages it links to with target="_blank"
+        self.failed = {}  # Normalized URL -> (URL as linked, error) for pages that couldn't be fetched
+
+    def links_from(self, url):
+        return self.same_tab_links.get(url, set()) | self.new_tab_links.get(url, set())
+
+class SiteCrawler:
+    def __init__(self, start_url, start_doc, max_pages=DEFAULT_MAX_PAGES, max_depth=DEFAULT_MAX_DEPTH, max_workers=DEFAULT_WORKERS):
+        self.start_url = start_url
+        self.start_doc = start_doc
+        self.base_netloc = urlparse(start_url).netloc
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+
+    def internal_links(self, page_url, doc):
+        """Yield (absolute URL, opens in new tab) for each internal anchor on a page."""
+        for a_tag in doc.find_all('a', href=True):
+            href = a_tag['href']
+            parsed_href = urlparse(href)
+            # Internal means same domain or a relative path; skip mailto:, javascript: etc.
+            if parsed_href.scheme and parsed_href.scheme not in ('http', 'https'):
+                continue
+            if not parsed_href.netloc or parsed_href.netloc == self.base_netloc:
+                yield urljoin(page_url, href), a_tag.get('target') == '_blank'
+
+    def _fetch(self, url):
+        try:
+            with tracing.span('crawl.fetch', host=urlparse(url).netloc) as span:
+                response = http_client.get(url)
+                span.set(status=response.status_code, bytes=len(response.content), cached=getattr(response, 'from_cache', False))
+            response.raise_for_status()
+            with tracing.span('parse', bytes=len(response.text)):
+                return ParsedPage(response.text), None
+        except requests.exceptions.RequestException as e:
+            return None, e
+
+    def crawl(self):
+        with tracing.span('crawl', start=self.start_url) as span:
+            site = self._crawl()
+            span.set(pages=len(site.pages), failed=len(site.failed))
+        return site
+
+    def _crawl(self):
+        start = normalize_url(self.start_url)
+        site = SiteGraph(start)
+        site.pages[start] = (self.start_url, self.start_doc)
+        seen = {start}
+        level = [start]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for depth in range(self.max_depth + 1):
+                to_fetch = []  # (normalized, absolute) pages discovered on this level
+                for source in level:
+                    source_url, doc = site.pages[source]
+                    same_tab = site.same_tab_links.setdefault(source, set())
+                    new_tab = site.new_tab_links.setdefault(source, set())
+                    for absolute_url, opens_new_tab in self.internal_links(source_url, doc):
+                        target = normalize_url(absolute_url)
+                        if target == source:
+                            continue  # Self-referential link
+                        (new_tab if opens_new_tab else same_tab).add(target)
+                        if target in seen or depth >= self.max_depth:
+                            continue
+                        if len(seen) >= self.max_pages:
+                            continue
+                        seen.add(target)
+                        to_fetch.append((target, absolute_url))
+
+                if not to_fetch:
+                    break
+                # Fetch every new page on this level at once
+                results = executor.map(lambda item: self._fetch(item[1]), to_fetch)
+                level = []
+                for (target, absolute_url), (doc, error) in zip(to_fetch, results):
+                    if doc is None:
+                        site.failed[target] = (absolute_url, error)
+                        continue
+                    site.pages[target] = (absolute_url, doc)
+                    level.append(target)
+        return site
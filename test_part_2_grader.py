@@ -1,124 +1,106 @@
-from bs4 import BeautifulSoup
 import requests
 import re
+from utilities import as_page
+from rubric import Rubric, Section, Rule
 
-# Function to grade an HTML test part 2 assignment
-def grade_html_test_part_2(url, student_name, assignment_name):
-    feedback = []
-    total_score = 0  # Maximum score based on rubric
+# Bump when the rubric changes so stored results are regraded
+GRADER_VERSION = "1.0"
 
-    try:
-        # Fetch the website HTML with SSL verification disabled
-        response = requests.get(url, verify=False)
-        response.raise_for_status()
-        content = response.text
+def internal_styles_content(f):
+    internal_styles = f.doc.find('style')
+    return internal_styles.text if internal_styles else ""
 
-        soup = BeautifulSoup(content, 'html.parser')
+def check_styles(f, tag):
+    # Inline style, or a class that the internal stylesheet mentions
+    return tag.get('style') or any(tag.get('class') and class_name in f['internal_styles_content'] for class_name in tag.get('class', []))
 
-        # Extract internal styles
-        internal_styles = soup.find('style')
-        internal_styles_content = internal_styles.text if internal_styles else ""
+def table_has_fewer(tag, minimum):
+    def check(f):
+        return bool(f['table']) and f.doc.count(tag, within=f['table']) < minimum
+    return check
 
-        def check_styles(tag):
-            return tag.get('style') or any(tag.get('class') and class_name in internal_styles_content for class_name in tag.get('class', []))
+def new_tab_links_missing(f):
+    links = [a for a in f.doc.find_all('a', href=True) if a.get('target') == '_blank']
+    return len(links) < 2
 
-        # Task 1: Theme selection & page setup (4 pts)
-        task_score = 4
-        if not '<!DOCTYPE html>' in content:
-            feedback.append("Missing correct HTML5 doctype.")
-            task_score -= 2
-        if not soup.find('title'):
-            feedback.append("Missing title tag or it is incorrect.")
-            task_score -= 2
-        total_score += max(0, task_score)
+def long_paragraph_missing(f):
+    return not any(len(p.text.split()) >= 5 for p in f.doc.find_all('p'))
 
+RUBRIC = Rubric(
+    name="HTML test part 2",
+    total=50,  # Maximum score based on rubric
+    facts={
+        'internal_styles_content': internal_styles_content,
+        'html5_doctype_missing': lambda f: '<!DOCTYPE html>' not in f.content,
+        'new_tab_links_missing': new_tab_links_missing,
+        'table': lambda f: f.doc.find('table'),
+        'table_missing': lambda f: not f['table'],
+        'table_few_rows': table_has_fewer('tr', 4),
+        'table_few_cells': table_has_fewer('td', 12),
+        'table_unstyled': lambda f: bool(f['table']) and not check_styles(f, f['table']),
+        'image': lambda f: f.doc.find('img'),
+        'image_missing': lambda f: not f['image'],
+        'image_src_missing': lambda f: bool(f['image']) and not f['image'].get('src'),
+        'image_unstyled': lambda f: bool(f['image']) and bool(f['image'].get('src')) and not check_styles(f, f['image']),
+        'lists_missing': lambda f: f['count:ul,ol'] < 2,
+        'long_paragraph_missing': long_paragraph_missing,
+        'special_char_missing': lambda f: re.search(r'&[#0-9a-zA-Z]+;', f.content) is None,
+        'extra_styles_missing': lambda f: f.doc.count(style=True) + (1 if f['has:style'] else 0) < 3,
+        'organization_missing': lambda f: not all(tag in f.content for tag in ['<body>', '<head>', '<html>']),
+    },
+    # Each task's deductions are capped at the points it is worth
+    sections=[
+        # Task 1: Theme selection & page setup (4 pts)
+        Section([
+            Rule('html5_doctype_missing', 2, "Missing correct HTML5 doctype."),
+            Rule('missing:title', 2, "Missing title tag or it is incorrect."),
+        ], cap=4),
         # Task 2: Header with Hyperlinks (6 pts)
-        task_score = 6
-        headers = soup.find_all(['h1', 'h2', 'h3'])
-        links = [a for a in soup.find_all('a', href=True) if a.get('target') == '_blank']
-        if not headers:
-            feedback.append("Missing proper header formatting (h1, h2, or h3).")
-            task_score -= 3
-        if len(links) < 2:
-            feedback.append("Missing required hyperlinks that open in a new tab.")
-            task_score -= 3
-        total_score += max(0, task_score)
-
+        Section([
+            Rule('missing:h1,h2,h3', 3, "Missing proper header formatting (h1, h2, or h3)."),
+            Rule('new_tab_links_missing', 3, "Missing required hyperlinks that open in a new tab."),
+        ], cap=6),
         # Task 3: Styled Table with Content (10 pts)
-        task_score = 10
-        table = soup.find('table')
-        if not table:
-            feedback.append("Missing table.")
-            task_score = 0
-        else:
-            rows = table.find_all('tr')
-            cells = table.find_all('td')
-            if len(rows) < 4:
-                feedback.append("Table must have at least 4 rows.")
-                task_score -= 3
-            if len(cells) < 12:
-                feedback.append("Table must have at least 12 cells.")
-                task_score -= 3
-            if not check_styles(table):
-                feedback.append("Table lacks necessary styling (inline or internal styles missing).")
-                task_score -= 4
-        total_score += max(0, task_score)
-
+        Section([
+            Rule('table_missing', 10, "Missing table."),
+            Rule('table_few_rows', 3, "Table must have at least 4 rows."),
+            Rule('table_few_cells', 3, "Table must have at least 12 cells."),
+            Rule('table_unstyled', 4, "Table lacks necessary styling (inline or internal styles missing)."),
+        ], cap=10),
         # Task 4: Image with Styles (6 pts)
-        task_score = 6
-        image = soup.find('img')
-        if not image:
-            feedback.append("Missing image.")
-            task_score = 0
-        elif not image.get('src'):
-            feedback.append("Image source is missing.")
-            task_score -= 3
-        elif not check_styles(image):
-            feedback.append("Image lacks required styling (inline or internal styles missing).")
-            task_score -= 3
-        total_score += max(0, task_score)
-
+        Section([
+            Rule('image_missing', 6, "Missing image."),
+            Rule('image_src_missing', 3, "Image source is missing."),
+            Rule('image_unstyled', 3, "Image lacks required styling (inline or internal styles missing)."),
+        ], cap=6),
         # Task 5: Lists & Horizontal Rule (10 pts)
-        task_score = 10
-        lists = soup.find_all(['ul', 'ol'])
-        hr = soup.find('hr')
-        if len(lists) < 2:
-            feedback.append("Missing required lists (one numbered and one bulleted list).")
-            task_score -= 5
-        if not hr:
-            feedback.append("Missing horizontal rule for content separation.")
-            task_score -= 5
-        total_score += max(0, task_score)
-
+        Section([
+            Rule('lists_missing', 5, "Missing required lists (one numbered and one bulleted list)."),
+            Rule('missing:hr', 5, "Missing horizontal rule for content separation."),
+        ], cap=10),
         # Task 6: Concluding Paragraph (5 pts)
-        task_score = 5
-        paragraphs = soup.find_all('p')
-        long_paragraphs = [p for p in paragraphs if len(p.text.split()) >= 5]
-        if not long_paragraphs:
-            feedback.append("Concluding paragraph is missing or too short (must be at least 5 sentences).")
-            task_score = 0
-        total_score += max(0, task_score)
-
+        Section([
+            Rule('long_paragraph_missing', 5, "Concluding paragraph is missing or too short (must be at least 5 sentences)."),
+        ], cap=5),
         # Task 7: Final Touches (5 pts)
-        task_score = 5
-        special_char = re.search(r'&[#0-9a-zA-Z]+;', content) is not None
-        if not special_char:
-            feedback.append("Missing use of a special character entity (e.g., &copy;, &amp;).")
-            task_score -= 3
-        if len(soup.find_all(style=True)) + (1 if internal_styles else 0) < 3:
-            feedback.append("Missing at least 3 additional styles (inline or internal) to enhance the appearance.")
-            task_score -= 2
-        total_score += max(0, task_score)
-
+        Section([
+            Rule('special_char_missing', 3, "Missing use of a special character entity (e.g., &copy;, &amp;)."),
+            Rule('extra_styles_missing', 2, "Missing at least 3 additional styles (inline or internal) to enhance the appearance."),
+        ], cap=5),
         # Overall organization & readability (4 pts)
-        task_score = 4
-        if not all(tag in content for tag in ['<body>', '<head>', '<html>']):
-            feedback.append("Code lacks proper organization and readability.")
-            task_score -= 4
-        total_score += max(0, task_score)
+        Section([
+            Rule('organization_missing', 4, "Code lacks proper organization and readability."),
+        ], cap=4),
+    ],
+)
 
+# Function to grade an HTML test part 2 assignment
+def grade_html_test_part_2(page, student_name, assignment_name):
+    try:
+        # Use the prefetched page, or fetch it if we were handed a URL
+        page = as_page(page)
     except requests.exceptions.RequestException as e:
-        feedback.append(f"Failed to fetch website: {e}~~")
-        total_score = 0
+        return 0, [f"Failed to fetch website: {e}~~"]
 
-    return total_score, feedback
+    # Parse once; the rubric queries the shared element index
+    return RUBRIC.evaluate(page.parse())
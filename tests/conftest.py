@@ -0,0 +1,19 @@
+# The tool is a set of top-level modules, so make them importable from tests/
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import http_client
+import link_checker
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    # grading_setup turns on process-wide caches; don't let them leak between tests
+    yield
+    http_client.disable_cache()
+    link_checker.configure()
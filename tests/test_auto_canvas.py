@@ -0,0 +1,47 @@
+# SpeedGrader uploads against mock_canvas; needs selenium and a Chrome driver
+import pytest
+
+pytest.importorskip('selenium')
+try:
+    import auto_canvas
+except Exception as e:  # e.g. pygetwindow has no backend on this platform
+    pytest.skip(f"auto_canvas can't be imported here: {e}", allow_module_level=True)
+
+from canvas_api import student_key
+from mock_canvas import MockCanvas
+
+@pytest.fixture(scope='module', autouse=True)
+def chrome():
+    try:
+        driver = auto_canvas.new_driver(headless=True)
+    except Exception as e:
+        pytest.skip(f"No headless Chrome: {e}")
+    driver.quit()
+
+@pytest.fixture
+def canvas():
+    with MockCanvas(students=6, job_delay=0) as canvas:
+        yield canvas
+
+def upload(canvas, students, tmp_path, sessions):
+    session = auto_canvas.CanvasSession("teacher", "secret", headless=True, cookie_path=str(tmp_path / "cookies.json"))
+    return auto_canvas.putGradesIn(students, canvas.speed_grader_url, sessions=sessions, session=session)
+
+def test_sessions_split_by_student(canvas, tmp_path):
+    keys = [student_key(user['name']) for user in canvas.users]
+    # The first student also has a late tuple; it must not reach a second browser
+    students = [(key, 10 + index, f"Feedback {index}") for index, key in enumerate(keys)] + [(keys[0], 1, "Late")]
+    results = upload(canvas, students, tmp_path, sessions=3)
+
+    assert [result.status for result in results] == ['updated'] * len(students)
+    assert canvas.grades == {user['id']: str(10 + index) for index, user in enumerate(canvas.users)}
+    assert canvas.comments == {user['id']: [f"Feedback {index}"] for index, user in enumerate(canvas.users)}
+
+def test_repeated_comment_is_still_waited_for(canvas, tmp_path):
+    user = canvas.users[0]
+    canvas.comments[user['id']] = ["Good job!"]
+    results = upload(canvas, [(student_key(user['name']), 9, "Good job!")], tmp_path, sessions=1)
+
+    assert results[0].status == 'updated'
+    assert canvas.grades[user['id']] == "9"
+    assert canvas.comments[user['id']] == ["Good job!", "Good job!"]
@@ -0,0 +1,44 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+import batch
+import tracing
+from benchmarks.server import SiteServer
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <head><title>Cereal</title></head>
+  <body><h1>Cereal</h1><hr><p>Crunchy.</p></body>
+</html>"""
+
+@pytest.fixture
+def traced():
+    tracing.enable()
+    yield
+    tracing.disable()
+
+def make_zip(path, base_url, students):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for number, student in enumerate(students, start=1):
+            archive.writestr(f"{student}_{1000 + number}_{5000 + number}_site.html", f'<a href="{base_url}/{student}.html">site</a>')
+
+def test_concurrent_jobs_write_one_trace(tmp_path, traced):
+    students = {"p1": ["ann", "bob"], "p2": ["cat", "dan", "eve"]}
+    with SiteServer({f"/{student}.html": PAGE for group in students.values() for student in group}) as server:
+        for period, names in students.items():
+            make_zip(tmp_path / f"{period}.zip", server.base_url, names)
+        summary_path = tmp_path / "out" / "summary.csv"
+        summaries = batch.main(["--job", str(tmp_path / "p1.zip"), "my first webpage", str(tmp_path / "p1"),
+                                "--job", str(tmp_path / "p2.zip"), "dungeon", str(tmp_path / "p2"),
+                                "--no-cache", "--summary", str(summary_path)])
+
+    assert [(summary['status'], summary['students']) for summary in summaries] == [('ok', 2), ('ok', 3)]
+    for period in students:
+        assert not os.path.exists(tmp_path / period / "csv" / tracing.TRACE_FILE)
+    with open(tmp_path / "out" / tracing.TRACE_FILE, encoding='utf-8') as file:
+        events = json.load(file)['traceEvents']
+    assert sorted(event['args']['grader'] for event in events if event['name'] == 'job') == ["dungeon", "my first webpage"]
+    assert sum(1 for event in events if event['name'] == 'student') == 5
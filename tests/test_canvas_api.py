@@ -0,0 +1,76 @@
+import pytest
+
+import canvas_api
+from canvas_api import CanvasAPIError, student_key, submit_grades
+from mock_canvas import MockCanvas
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(canvas_api, 'PROGRESS_POLL_INTERVAL', 0.01)
+
+def graded_tuples(canvas, score=8):
+    return [(student_key(user['name']), score, f"Feedback for {user['name']}") for user in canvas.users]
+
+def statuses(results):
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return counts
+
+def test_upload_then_rerun_is_unchanged():
+    with MockCanvas(students=120, job_delay=0.05) as canvas:
+        students = graded_tuples(canvas)
+        assert statuses(submit_grades(students, canvas.speed_grader_url, canvas.token)) == {'updated': 120}
+        assert canvas.grades == {user['id']: "8" for user in canvas.users}
+        assert all(len(comments) == 1 for comments in canvas.comments.values())
+
+        assert statuses(submit_grades(students, canvas.speed_grader_url, canvas.token)) == {'unchanged': 120}
+        assert all(len(comments) == 1 for comments in canvas.comments.values())
+
+def test_bad_token_raises():
+    with MockCanvas(students=3) as canvas:
+        with pytest.raises(CanvasAPIError, match="401"):
+            submit_grades(graded_tuples(canvas), canvas.speed_grader_url, "wrong-token")
+        assert canvas.grades == {}
+
+def test_unknown_student_is_not_found():
+    with MockCanvas(students=3, job_delay=0) as canvas:
+        results = submit_grades(graded_tuples(canvas) + [("nobodyjane", 5, "Hi")], canvas.speed_grader_url, canvas.token)
+        assert statuses(results) == {'updated': 3, 'not_found': 1}
+        assert [result.student for result in results if result.status == 'not_found'] == ["nobodyjane"]
+
+def test_existing_grades_are_skipped_unless_update_all():
+    with MockCanvas(students=3, job_delay=0) as canvas:
+        first = canvas.users[0]['id']
+        canvas.grades[first] = "3"
+        students = graded_tuples(canvas)
+
+        results = submit_grades(students, canvas.speed_grader_url, canvas.token)
+        assert statuses(results) == {'updated': 2, 'skipped': 1}
+        assert canvas.grades[first] == "3"
+
+        results = submit_grades(students, canvas.speed_grader_url, canvas.token, update_all=True)
+        assert statuses(results) == {'updated': 1, 'unchanged': 2}
+        assert canvas.grades[first] == "8"
+
+def test_rate_limited_requests_are_retried():
+    # Only one request may be in flight; the other batches get 403 Rate Limit Exceeded
+    with MockCanvas(students=40, job_delay=0, max_concurrent=1, latency=0.3) as canvas:
+        results = submit_grades(graded_tuples(canvas), canvas.speed_grader_url, canvas.token, batch_size=10, max_concurrent=4)
+        assert canvas.rejected > 0
+        assert statuses(results) == {'updated': 40}
+        assert len(canvas.grades) == 40
+
+def test_duplicate_student_keeps_the_first_tuple():
+    with MockCanvas(students=3, job_delay=0) as canvas:
+        students = graded_tuples(canvas)
+        late = (students[0][0], 1, "Error processing file: late")
+        results = submit_grades(students + [late], canvas.speed_grader_url, canvas.token)
+        assert statuses(results) == {'updated': 3}
+        assert [result.student for result in results].count(students[0][0]) == 1
+        first = canvas.users[0]['id']
+        assert canvas.grades[first] == "8"
+        assert canvas.comments[first] == [students[0][2]]
+
+        results = submit_grades(students + [late], canvas.speed_grader_url, canvas.token)
+        assert statuses(results) == {'unchanged': 3}
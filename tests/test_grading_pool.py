@@ -0,0 +1,33 @@
+import json
+import os
+import zipfile
+
+import link_checker
+import utilities
+from benchmarks.server import SiteServer
+from my_first_website_grader import grade_my_first_website
+
+def test_pooled_link_checks_are_saved_and_reused(tmp_path):
+    with SiteServer({}) as external, SiteServer({}) as sites:
+        link = f"{external.base_url}/ext/docs"
+        with zipfile.ZipFile(tmp_path / "submissions.zip", 'w') as archive:
+            for number, student in enumerate(["ann", "bob", "cat", "dan"], start=1):
+                sites.put(f"/{student}/index.html", f'<a href="page1.html">Next</a><a href="{link}" target="_blank">Docs</a>')
+                sites.put(f"/{student}/page1.html", '<a href="index.html">Back</a>')
+                archive.writestr(f"{student}_{1000 + number}_{5000 + number}_site.html", f'<a href="{sites.base_url}/{student}/index.html">site</a>')
+
+        def run():
+            results_path = str(tmp_path / "results")
+            submissions = utilities.grading_setup(str(tmp_path / "submissions.zip"), results_path)
+            return utilities.grade_extracted_files(grade_my_first_website, results_path, submissions, "my first website",
+                                                   incremental=False, processes=2)
+
+        assert [score for _, score, _ in run()] == [20] * 4
+        probes = len(external.requests)
+        assert 1 <= probes <= 2  # At most once per worker
+        with open(tmp_path / "results" / "fetched_pages" / link_checker.LINK_CACHE_FILE, encoding='utf-8') as file:
+            assert len(json.load(file)) == 1
+
+        # The next run's workers start from the saved results
+        assert [score for _, score, _ in run()] == [20] * 4
+        assert len(external.requests) == probes
@@ -0,0 +1,44 @@
+import zipfile
+
+import pytest
+
+import grading_manifest
+import utilities
+from benchmarks.server import SiteServer
+from grading_manifest import GradingManifest
+from my_first_website_grader import grade_my_first_website
+
+INDEX = """<html><body>
+<a href="page1.html">Page 1</a>
+<a href="https://example.com/">Example</a>
+</body></html>"""
+PAGE1_ONE_WAY = "<html><body><p>No way back</p></body></html>"
+PAGE1_LINKED = '<html><body><a href="index.html">Home</a></body></html>'
+
+@pytest.fixture
+def site():
+    with SiteServer({"/s/ann/index.html": INDEX, "/s/ann/page1.html": PAGE1_ONE_WAY}) as server:
+        yield server
+
+def grade(site, tmp_path):
+    zip_path = tmp_path / "submissions.zip"
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr("ann_1001_5001_website.html", f'<a href="{site.base_url}/s/ann/index.html">my site</a>')
+    results_path = str(tmp_path / "results")
+    submissions = utilities.grading_setup(str(zip_path), results_path)
+    return utilities.grade_extracted_files(grade_my_first_website, results_path, submissions, "my first website")
+
+def test_linked_page_change_is_regraded(site, tmp_path):
+    # Only page1 changes; the submission and the submitted page stay the same
+    assert grade(site, tmp_path)[0][1] == 10
+    site.put("/s/ann/page1.html", PAGE1_LINKED)
+    assert grade(site, tmp_path)[0][1] == 16
+
+def test_manifest_is_saved_during_the_run(tmp_path, monkeypatch):
+    manifest = GradingManifest(str(tmp_path))
+    manifest.record("ann.html", "s", "p", "key", (False, ("ann", 7, "good"), {'Score': 7, 'Feedback': "good"}))
+    manifest.save_if_due()
+    assert not (tmp_path / grading_manifest.MANIFEST_FILE).exists()
+    monkeypatch.setattr(grading_manifest, 'SAVE_INTERVAL', 0)
+    manifest.save_if_due()
+    assert GradingManifest(str(tmp_path)).lookup("ann.html", "s", "p", "key") == (False, ("ann", 7, "good"), {'Score': 7, 'Feedback': "good"})
@@ -0,0 +1,37 @@
+from results_model import ResultsModel
+
+def filled():
+    model = ResultsModel()
+    for student, score, feedback, late in [("cat", 30, "Good job!", False), ("ann", 12, "Missing <hr>", True),
+                                           ("bob", "", "Error processing file: timeout", False), ("dan", 40, "Good job!", False)]:
+        model.append(student, score, feedback, late)
+    return model
+
+def students(model):
+    return [values[0] for _, values in model.rows(0, len(model))]
+
+def test_sort_by_score_puts_missing_scores_last():
+    model = filled()
+    model.sort('Score')
+    assert students(model) == ["ann", "cat", "dan", "bob"]
+    model.sort('Score', reverse=True)
+    assert students(model) == ["bob", "dan", "cat", "ann"]
+
+def test_filter_then_append_keeps_filter_and_sort():
+    model = filled()
+    model.sort('Student')
+    model.set_filter(text="good")
+    model.append("abe", 35, "Good job!")
+    model.append("eve", 5, "Missing <p>")
+    assert students(model) == ["abe", "cat", "dan"]
+    assert model.total == 6
+
+def test_clear_forgets_rows_and_sort_order():
+    model = filled()
+    model.sort('Student', reverse=True)
+    model.clear()
+    assert model.sort_order is None
+    assert len(model) == 0
+    model.append("zed", 1, "x")
+    model.append("amy", 2, "y")
+    assert students(model) == ["zed", "amy"]
@@ -0,0 +1,38 @@
+import csv
+
+import pytest
+
+from results_writer import ResultsWriter
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+def crash(writer, rows):
+    with pytest.raises(RuntimeError):
+        with writer:
+            for student, row in rows:
+                writer.write(student, row)
+            raise RuntimeError("grading crashed")
+
+def test_rows_are_sorted_into_the_csv(tmp_path):
+    with ResultsWriter(str(tmp_path)) as writer:
+        writer.write("bob", {'Score': 5, 'Feedback': "ok"})
+        writer.write("ann", {'Score': 7, 'Feedback': "good"})
+    assert read_csv(writer.csv_path) == [['', 'Score', 'Feedback'], ['ann', '7', 'good'], ['bob', '5', 'ok']]
+    assert not (tmp_path / "grading_results.partial.csv").exists()
+
+def test_partial_file_of_a_crashed_run_is_recovered(tmp_path):
+    crash(ResultsWriter(str(tmp_path)), [("bob", {'Score': 5, 'Feedback': "ok"}), ("ann", {'Score': 7, 'Feedback': "good"})])
+    writer = ResultsWriter(str(tmp_path))
+    assert read_csv(writer.csv_path) == [['', 'Score', 'Feedback'], ['ann', '7', 'good'], ['bob', '5', 'ok']]
+    writer.write("cat", {'Score': 9, 'Feedback': "great"})
+    writer.close()
+    assert read_csv(writer.csv_path) == [['', 'Score', 'Feedback'], ['cat', '9', 'great']]
+
+def test_empty_partial_file_keeps_the_last_results(tmp_path):
+    with ResultsWriter(str(tmp_path)) as writer:
+        writer.write("ann", {'Score': 7, 'Feedback': "good"})
+    crash(ResultsWriter(str(tmp_path)), [])
+    ResultsWriter(str(tmp_path))._close_files()
+    assert read_csv(writer.csv_path) == [['', 'Score', 'Feedback'], ['ann', '7', 'good']]
@@ -0,0 +1,17 @@
+import pytest
+
+from parsed_page import ParsedPage
+from rubric import Rubric, Section, Rule
+
+def test_unknown_fact_fails_when_the_rubric_is_defined():
+    with pytest.raises(ValueError, match="missing_thing"):
+        Rubric("typo", 10, [Section([Rule('missing_thing', 5, "Oops")])])
+
+def test_capped_section_and_combined_feedback():
+    rubric = Rubric("tags", 20, facts={'items': lambda f: f['count:li']}, sections=[
+        Section([Rule('missing:h1', 4, "h1"), Rule('missing:hr', 4, "hr"), Rule('missing:p', 4, "p")], cap=6, feedback="Missing: {}."),
+        Section([Rule(lambda f: f['items'] < 2, 3, "Only {items} item(s).")]),
+    ])
+    score, feedback = rubric.evaluate(ParsedPage("<html><body><p>Hi</p><ul><li>One</li></ul></body></html>"))
+    assert score == 20 - 6 - 3
+    assert feedback == ["Missing: h1, hr.", "Only 1 item(s)."]